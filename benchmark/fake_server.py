@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+'''
+A local HTTP stand-in for web CQ, serving `cqlogin.cq`, `cqfind.cq` and
+`cqartifactdetails.cq` with `for(;;);` prefixed JSON responses.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import http.server
+import json
+import multiprocessing
+import threading
+import time
+import urllib.parse
+
+PREFIX = b'for(;;);'
+
+
+def _field(name, value, data_type='SHORT_STRING', record_id=None):
+    field = {
+        'FieldName': name,
+        'CurrentValue': value,
+        'DataType': data_type,
+    }
+    if record_id is not None:
+        field['RecordId'] = record_id
+    return field
+
+
+def _details(resource_id, display_name, fields):
+    return {
+        'STATUS': 'true',
+        'RecordId': resource_id,
+        'DisplayName': display_name,
+        'StableLocation': 'cq.repo.cq-record:%s' % resource_id,
+        'State': 'VIEW',
+        'recordType': 'record-type',
+        'fields': fields,
+    }
+
+
+class FakeCQData(object):
+    '''
+    Deterministic data set of `records` CRPs referencing `customers`
+    customers and `modules` modules. Each CRP carries `payload_size` bytes of
+    extra history data which no record class consumes.
+    '''
+
+    def __init__(self, records=1000, customers=30, modules=30,
+                 payload_size=4096):
+        self.records = records
+        self.customers = customers
+        self.modules = modules
+        self.payload_size = payload_size
+        self._cache = {}
+
+    @staticmethod
+    def record_id(n):
+        return 'CRP%08d' % n
+
+    def resource_id(self, record_id):
+        if record_id.startswith('CRP'):
+            n = int(record_id[3:])
+            if 0 <= n < self.records:
+                return 'crp-%d' % n
+        return None
+
+    def details(self, resource_id):
+        body = self._cache.get(resource_id)
+        if body is None:
+            jobj = self._make_details(resource_id)
+            if jobj is None:
+                return None
+            body = PREFIX + json.dumps(jobj).encode('utf-8')
+            self._cache[resource_id] = body
+        return body
+
+    def _make_details(self, resource_id):
+        kind, _, n = resource_id.partition('-')
+        if not n.isdigit():
+            return None
+        n = int(n)
+        if kind == 'customer' and n < self.customers:
+            return _details(resource_id, 'Customer %d' % n, [])
+        if kind == 'module' and n < self.modules:
+            return _details(resource_id, 'Module %d' % n, [])
+        if kind != 'crp' or n >= self.records:
+            return None
+        record_id = self.record_id(n)
+        fields = [
+            _field('ModuleName', 'module', 'RESOURCE',
+                   'module-%d' % (n % self.modules)),
+            _field('State', 'Assigned'),
+            _field('LastOpDate', '2017-12-04T01:56:01Z'),
+            _field('OwnerInfo', 'Tel: %d\r\nEmail: owner%d@example.com'
+                   % (n, n)),
+            _field('OpenDuration', str(n % 100), 'INTEGER'),
+            _field('Customer', 'customer', 'RESOURCE',
+                   'customer-%d' % (n % self.customers)),
+            _field('VersionBaseOn', 'v1.%d' % (n % 10)),
+            _field('Headline', 'Headline of %s' % record_id),
+            _field('id', record_id),
+            _field('CustomerPhone', '555-%04d' % (n % 10000)),
+            _field('CustomEmails', ['a%d@example.com' % n],
+                   'MULTILINE_STRING'),
+            _field('Description', 'd' * (self.payload_size // 2),
+                   'MULTILINE_STRING'),
+        ]
+        jobj = _details(resource_id, record_id, fields)
+        jobj['history'] = [{'action': 'Modify', 'text': 'h' * 64}
+                           for _ in range(self.payload_size // 2 // 100)]
+        return jobj
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, avoid delayed ACK stalls.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle({})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8')
+        self._handle(dict(urllib.parse.parse_qsl(body)))
+
+    def _handle(self, data):
+        url = urllib.parse.urlsplit(self.path)
+        page = url.path.rsplit('/', 1)[-1]
+        params = dict(urllib.parse.parse_qsl(url.query))
+        action = params.get('action')
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        with server.lock:
+            server.counts[action] = server.counts.get(action, 0) + 1
+
+        body = None
+        if page == 'cqlogin.cq':
+            body = self._login(action, data)
+        elif page == 'cqfind.cq' and action == 'DoFindRecord':
+            resource_id = server.data.resource_id(params.get('recordId', ''))
+            if resource_id is None:
+                body = {'status': 'false'}
+            else:
+                body = {'status': 'true', 'id': resource_id}
+        elif page == 'cqartifactdetails.cq' and \
+                action == 'GetCQRecordDetails':
+            body = server.data.details(params.get('resourceId', ''))
+            if body is None:
+                body = {'STATUS': 'false'}
+        if body is None:
+            self.send_error(404)
+            return
+        if not isinstance(body, bytes):
+            body = PREFIX + json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _login(self, action, data):
+        if action == 'DoLogin':
+            return {'status': 'true', 'cqUid': 'bench-cquid',
+                    'userdb': 'db', 'fullName': data.get('loginId')}
+        if action == 'DoLogout':
+            return {'status': 'true'}
+        if action == 'CheckAuthenticated':
+            return {'STATUS': 'true', 'isAuthenticated': True}
+        if action == 'DoGetDbSets':
+            return {'identifier': 'name', 'items': [{'name': 'db'}]}
+        return None
+
+
+class FakeCQServer(http.server.ThreadingHTTPServer):
+    '''
+    Fake web CQ server listening on `127.0.0.1`, each response is delayed by
+    `latency` seconds. Use as a context manager to serve in a background
+    thread.
+    '''
+
+    daemon_threads = True
+
+    def __init__(self, data=None, latency=0, port=0):
+        super(FakeCQServer, self).__init__(('127.0.0.1', port), _Handler)
+        self.data = data or FakeCQData()
+        self.latency = latency
+        self.counts = {}
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%d/cqweb/' % self.server_address[1]
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+def _serve(data, latency, queue):
+    server = FakeCQServer(data, latency)
+    queue.put(server.url)
+    server.serve_forever()
+
+
+class FakeCQProcess(object):
+    '''
+    Run a `FakeCQServer` in a child process, so the server does not compete
+    with the client for the GIL. Use as a context manager.
+    '''
+
+    def __init__(self, data=None, latency=0):
+        self.data = data or FakeCQData()
+        self.latency = latency
+        self.url = None
+        self._process = None
+
+    def __enter__(self):
+        queue = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(self.data, self.latency, queue))
+        self._process.daemon = True
+        self._process.start()
+        self.url = queue.get(timeout=30)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._process.terminate()
+        self._process.join()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+'''
+Benchmarks of libwebcq against a local fake web CQ server.
+
+Run all benchmarks:
+
+    python -m benchmark.run
+
+Each benchmark is repeated and the median and best throughput are reported,
+use `--json` to save results for comparing across runs.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+from libwebcq import decode
+from libwebcq.CQ import CQ
+from libwebcq.record import Record, RecordType
+from .fake_server import FakeCQData, FakeCQProcess
+
+
+class _NoFetch(object):
+    '''
+    Stand-in client for parse benchmarks, referenced records are not fetched.
+    '''
+
+    def get_cq_record_details(self, resource_id, record_type):
+        return None
+
+
+def _client(server, workers):
+    cq = CQ(server.url)
+    cq.set_pool_size(10, max(10, workers))
+    cq.set_record_cache(None)
+    cq.open_session()
+    return cq
+
+
+def bench_login(server, args):
+    for _ in range(args.records // 10 or 1):
+        cq = _client(server, 1)
+        cq.login('user', 'password', 'repo')
+        cq.logout()
+        cq.close_session()
+    return args.records // 10 or 1
+
+
+def bench_serial(server, args):
+    cq = _client(server, 1)
+    cq.login('user', 'password', 'repo')
+    for n in range(args.records):
+        resource_id = cq.find_record(FakeCQData.record_id(n))
+        cq.get_cq_record_details(resource_id, RecordType.CRP)
+    cq.close_session()
+    return args.records
+
+
+def bench_batch(server, args):
+    cq = _client(server, args.workers)
+    cq.set_max_workers(args.workers)
+    cq.login('user', 'password', 'repo')
+    record_ids = [FakeCQData.record_id(n) for n in range(args.records)]
+    resource_ids = [r.value for r in cq.find_records(record_ids)]
+    for result in cq.get_records_details(resource_ids, RecordType.CRP):
+        if not result.ok:
+            raise result.error
+    cq.close_session()
+    return args.records
+
+
+def bench_decode(server, args):
+    body = server.data.details('crp-1')
+    decoder = decode.JSONDecoder()
+    for _ in range(args.records):
+        decoder.decode(body, 'utf-8')
+    return args.records
+
+
+def bench_parse(server, args):
+    body = server.data.details('crp-1')
+    jobj = decode.JSONDecoder().decode(body, 'utf-8')
+    client = _NoFetch()
+    for _ in range(args.records):
+        Record.create_from_json_resp(client, jobj, RecordType.CRP, lazy=True)
+    return args.records
+
+
+BENCHMARKS = [
+    ('login', bench_login),
+    ('find_details_serial', bench_serial),
+    ('find_details_batch', bench_batch),
+    ('decode', bench_decode),
+    ('parse', bench_parse),
+]
+
+
+def run(args):
+    data = FakeCQData(records=args.records, payload_size=args.payload)
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'orjson': decode.orjson is not None,
+        },
+        'parameters': vars(args).copy(),
+        'benchmarks': {},
+    }
+    results['parameters'].pop('json', None)
+    with FakeCQProcess(data, latency=args.latency) as server:
+        for name, func in BENCHMARKS:
+            if args.only and name not in args.only:
+                continue
+            rates = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                count = func(server, args)
+                rates.append(count / (time.perf_counter() - start))
+            results['benchmarks'][name] = {
+                'median_ops': statistics.median(rates),
+                'best_ops': max(rates),
+            }
+            print('%-22s %12.1f ops/s (best %.1f)' % (
+                name, statistics.median(rates), max(rates)))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=200,
+                        help='number of records per benchmark run')
+    parser.add_argument('--latency', type=float, default=0.002,
+                        help='server latency of each response in seconds')
+    parser.add_argument('--payload', type=int, default=16384,
+                        help='extra bytes of each CRP details response')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='worker threads of batch benchmarks')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='repeat each benchmark this many times')
+    parser.add_argument('--only', nargs='*', help='benchmarks to run')
+    parser.add_argument('--json', help='write results to this JSON file')
+    args = parser.parse_args(argv)
+    results = run(args)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import logging
+
+from .CQ import CQ
+
+
+class AsyncCQ(object):
+    '''
+    An asyncio helper class for access web ClearQuest.
+
+    It has the same methods as `CQ`, all methods need access network resources
+    are coroutines. The blocking HTTP round trips are run in a thread pool and
+    at most `max_in_flight` of them are in flight at the same time, so many
+    lookups can overlap on one event loop.
+    '''
+
+    def __init__(self, url, max_in_flight=16):
+        self.cq = CQ(url)
+        self.max_in_flight = max_in_flight
+        self._executor = None
+        self._semaphore = None
+        self._in_flight = {}
+
+    @property
+    def url(self):
+        return self.cq.url
+
+    @property
+    def cquid(self):
+        return self.cq.cquid
+
+    @property
+    def login_status(self):
+        return self.cq.login_status
+
+    @property
+    def relogins(self):
+        return self.cq.relogins
+
+    @property
+    def userdb(self):
+        return self.cq.userdb
+
+    @property
+    def full_name(self):
+        return self.cq.full_name
+
+    def set_timezone(self, timezone):
+        '''
+        Set timezone offset. The default timezone offset is `GMT+8:00`.
+        '''
+        self.cq.set_timezone(timezone)
+
+    def add_hook(self, event, hook):
+        '''
+        See `CQ.add_hook`.
+        '''
+        self.cq.add_hook(event, hook)
+
+    def remove_hook(self, event, hook):
+        '''
+        See `CQ.remove_hook`.
+        '''
+        self.cq.remove_hook(event, hook)
+
+    def set_session_file(self, path):
+        '''
+        See `CQ.set_session_file`.
+        '''
+        self.cq.set_session_file(path)
+
+    def set_auto_relogin(self, enabled):
+        '''
+        See `CQ.set_auto_relogin`.
+        '''
+        self.cq.set_auto_relogin(enabled)
+
+    def set_timeout(self, timeout, action=None):
+        '''
+        See `CQ.set_timeout`.
+        '''
+        self.cq.set_timeout(timeout, action)
+
+    def set_throttle(self, throttle):
+        '''
+        See `CQ.set_throttle`.
+        '''
+        self.cq.set_throttle(throttle)
+
+    def set_retry_policy(self, policy):
+        '''
+        See `CQ.set_retry_policy`.
+        '''
+        self.cq.set_retry_policy(policy)
+
+    def set_single_flight(self, enabled):
+        '''
+        See `CQ.set_single_flight`.
+        '''
+        self.cq.set_single_flight(enabled)
+
+    def set_record_cache(self, cache):
+        '''
+        See `CQ.set_record_cache`.
+        '''
+        self.cq.set_record_cache(cache)
+
+    def set_identity_map(self, identity_map):
+        '''
+        See `CQ.set_identity_map`.
+        '''
+        self.cq.set_identity_map(identity_map)
+
+    def set_lazy_references(self, lazy):
+        '''
+        See `CQ.set_lazy_references`.
+
+        Referenced records of lazy records must be awaited, with
+        `prefetch_references` or `record.async_resolve_references`, before
+        they are accessed, accessing them before raises `error.CQError`
+        instead of blocking the event loop.
+        '''
+        self.cq.set_lazy_references(lazy)
+
+    def set_record_store(self, store):
+        '''
+        See `CQ.set_record_store`.
+        '''
+        self.cq.set_record_store(store)
+
+    def set_record_index(self, index):
+        '''
+        See `CQ.set_record_index`.
+        '''
+        self.cq.set_record_index(index)
+
+    def invalidate_record(self, resource_id, record_type=None):
+        '''
+        See `CQ.invalidate_record`.
+        '''
+        self.cq.invalidate_record(resource_id, record_type)
+
+    def set_default_fields(self, record_type, fields):
+        '''
+        See `CQ.set_default_fields`.
+        '''
+        self.cq.set_default_fields(record_type, fields)
+
+    def set_streaming(self, streaming):
+        '''
+        See `CQ.set_streaming`.
+        '''
+        self.cq.set_streaming(streaming)
+
+    def open_session(self):
+        '''
+        You should call `open_session` before call any coroutine that need
+        access network resources.
+        '''
+        # Let every in flight request keep its own pooled connection.
+        if self.cq.pool_maxsize < self.max_in_flight:
+            self.cq.set_pool_size(self.cq.pool_connections, self.max_in_flight)
+        self.cq.open_session()
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_in_flight)
+
+    def close_session(self):
+        '''
+        You should call `close_session` to release inner resources when you no
+        need to access network resources.
+        '''
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._semaphore = None
+        self.cq.close_session()
+
+    async def check_authenticated(self, cquid=None):
+        '''
+        Coroutine version of `CQ.check_authenticated`.
+        '''
+        return await self._run(self.cq.check_authenticated, cquid)
+
+    async def get_db_sets(self):
+        '''
+        Coroutine version of `CQ.get_db_sets`.
+        '''
+        return await self._run(self.cq.get_db_sets)
+
+    async def login(self, username, password, repository):
+        '''
+        Coroutine version of `CQ.login`.
+        '''
+        return await self._run(self.cq.login, username, password, repository)
+
+    async def save_session(self, path):
+        '''
+        Coroutine version of `CQ.save_session`.
+        '''
+        return await self._run(self.cq.save_session, path)
+
+    async def restore_session(self, path, username=None, repository=None):
+        '''
+        Coroutine version of `CQ.restore_session`.
+        '''
+        return await self._run(self.cq.restore_session, path, username,
+                               repository)
+
+    async def logout(self):
+        '''
+        Coroutine version of `CQ.logout`.
+        '''
+        return await self._run(self.cq.logout)
+
+    async def find_record(self, record_id):
+        '''
+        Coroutine version of `CQ.find_record`.
+        '''
+        self.cq._ensure_session()
+        self.cq._ensure_login()
+        return await self._coalesce(('DoFindRecord', record_id), self._run,
+                                    self.cq._find_record, record_id)
+
+    async def get_record(self, record_id, record_type, fields=None,
+                         all_tabs=True):
+        '''
+        Coroutine version of `CQ.get_record`.
+        '''
+        self.cq._ensure_session()
+        self.cq._ensure_login()
+        resource_id = self.cq._indexed_resource_id(record_id)
+        if resource_id is not None:
+            record = await self.get_cq_record_details(
+                resource_id, record_type, fields, all_tabs)
+            if self.cq._check_indexed_record(record_id, record):
+                return record
+        resource_id = await self.find_record(record_id)
+        if resource_id is None:
+            return None
+        return await self.get_cq_record_details(
+            resource_id, record_type, fields, all_tabs)
+
+    async def get_cq_record_details(self, resource_id, record_type,
+                                    fields=None, all_tabs=True):
+        '''
+        Coroutine version of `CQ.get_cq_record_details`.
+
+        Referenced records, e.g. customer and module of a CRP, are fetched
+        concurrently unless lazy references are set, see
+        `set_lazy_references`.
+        '''
+        record, key = self.cq._lookup_cq_record_details(
+            resource_id, record_type, fields, all_tabs)
+        if key is None:
+            return record
+        return await self._coalesce(key, self._get_cq_record_details,
+                                    *key[1:])
+
+    async def _get_cq_record_details(self, resource_id, record_type, fields,
+                                     all_tabs):
+        jobj = await self._run(self.cq._load_cq_record_details, resource_id,
+                               record_type, fields, all_tabs)
+        if jobj is None:
+            return None
+        record = self.cq._parse_cq_record_details(
+            self, jobj, resource_id, record_type, fields, all_tabs)
+        if not self.cq.lazy_references:
+            await record.async_resolve_references()
+        self.cq._cache_cq_record_details(
+            record, resource_id, record_type, fields, all_tabs)
+        return record
+
+    async def prefetch_references(self, records):
+        '''
+        Coroutine version of `CQ.prefetch_references`, referenced records
+        are fetched concurrently.
+        '''
+        self.cq._ensure_session()
+        self.cq._ensure_login()
+        pending = collections.OrderedDict()
+        for record in records:
+            if record is None:
+                continue
+            for attr_name, resource_id, record_type in \
+                    record.unresolved_references():
+                key = (resource_id, record_type)
+                pending.setdefault(key, []).append((record, attr_name))
+        results = await asyncio.gather(*[
+            self.get_cq_record_details(*key) for key in pending],
+            return_exceptions=True)
+        for key, value in zip(pending, results):
+            if isinstance(value, BaseException):
+                # Keep unresolved, it can be prefetched again.
+                logging.warning('Prefetch record %s failed: %s', key[0],
+                                value)
+                continue
+            for record, attr_name in pending[key]:
+                setattr(record, attr_name, value)
+
+    async def _coalesce(self, key, func, *args):
+        '''
+        Await `func(*args)`, share it with concurrent callers of the same `key`
+        if single-flight of the inner `CQ` is enabled.
+        '''
+        if self.cq.single_flight is None:
+            return await func(*args)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # A cancelled caller should not cancel the shared call.
+        return await asyncio.shield(task)
+
+    async def _run(self, func, *args):
+        '''
+        Run a blocking `CQ` method in the thread pool.
+        '''
+        # Check here so errors are raised in the caller's task.
+        self.cq._ensure_session()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        loop = asyncio.get_event_loop()
+        async with self._semaphore:
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args))
@@ -3,15 +3,36 @@
 # Author: weichen2046@gmail.com
 # Create Date: 2017.12.02
 
+import collections
+import concurrent.futures
+from http import HTTPStatus
+import json
 import logging
-import re
+import os
+import threading
+import time
 import urllib
 import uuid
-import requests
-import demjson
 
-from .record import Record
-from .error import NeedLoginError, SessionError
+from . import instrument
+from .batch import iter_batch, run_batch
+from .cache import IdentityMap, LRUCache
+from .decode import JSONDecoder
+from .record import Record, RecordType
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
+from .stream import parse_details
+from .index import RecordIndex
+from .error import CQError, NeedLoginError, SessionError, SessionExpiredError
+
+
+def _network_errors():
+    '''
+    Return errors of `requests` worth retrying, `requests` is imported by
+    `CQ.open_session` already.
+    '''
+    import requests
+    return (requests.ConnectionError, requests.Timeout)
 
 
 class CQ(object):
@@ -22,9 +43,24 @@ class CQ(object):
     path_map = {
         'LOGIN': 'cqlogin.cq',
         'FIND': 'cqfind.cq',
+        'QUERY': 'cqqueryresult.cq',
         'DETAILS': 'cqartifactdetails.cq',
     }
 
+    # Parameters and response keys of query requests. Query results are
+    # assumed to be paged Dojo data stores like the response of `DoGetDbSets`,
+    # i.e. rows in `items`, the row key column in `identifier`, and the total
+    # row count in `numRows`. Change them with `set_query_protocol` if your
+    # server differs.
+    query_protocol = {
+        'action': 'ExecuteQuery',
+        'query_param': 'resourceId',
+        'start_param': 'start',
+        'count_param': 'count',
+        'rows_key': 'items',
+        'total_key': 'numRows',
+    }
+
     def __init__(self, url):
         self.login_status = False
         self.url = url
@@ -33,6 +69,37 @@ class CQ(object):
         self.tz_offset = 'GMT+8:00'
         self.userdb = None
         self.full_name = None
+        self.max_workers = 8
+        self.query_page_size = 100
+        self.record_cache = LRUCache()
+        self.identity_map = IdentityMap()
+        self.lazy_references = False
+        self.decoder = JSONDecoder()
+        self.streaming = False
+        self.default_fields = {}
+        self.stream_chunk_size = 64 * 1024
+        self.pool_connections = 10
+        self.pool_maxsize = 10
+        self.timeout = None
+        self.timeouts = {}
+        self.retry_policy = RetryPolicy()
+        self.record_store = None
+        self.record_index = RecordIndex()
+        self.hooks = instrument.Hooks()
+        self.single_flight = SingleFlight()
+        self.throttle = None
+        self.session_file = None
+        self.auto_relogin = True
+        self.relogins = 0
+        self.relogin_failures = 0
+        # (username, repository) of the login session.
+        self._login_id = (None, None)
+        # (username, password, repository) kept for re-login.
+        self._credentials = None
+        # Increased by each login, so concurrent requests failed with the
+        # same expired session re-login only once.
+        self._login_generation = 0
+        self._login_lock = threading.Lock()
 
     def set_timezone(self, timezone):
         '''
@@ -40,6 +107,204 @@ class CQ(object):
         '''
         self.tz_offset = timezone
 
+    def set_session_file(self, path):
+        '''
+        Set the file where `login` saves the authenticated session and
+        restores it from next time, e.g. in another process. The default
+        value None means sessions are not saved.
+        '''
+        self.session_file = path
+
+    def set_auto_relogin(self, enabled):
+        '''
+        Set whether to login again with the credentials of the last `login`
+        and replay the request when the session expired. The default value is
+        True, credentials are not kept if set to False.
+        '''
+        self.auto_relogin = enabled
+        if not enabled:
+            self._credentials = None
+
+    def add_hook(self, event, hook):
+        '''
+        Register an instrumentation hook, `event` is one of the event names in
+        `instrument`, e.g. `instrument.AFTER_REQUEST`. The hook is called with
+        a dict describing the event, see `instrument` for the keys.
+        '''
+        self.hooks.add(event, hook)
+
+    def remove_hook(self, event, hook):
+        '''
+        Unregister an instrumentation hook.
+        '''
+        self.hooks.remove(event, hook)
+
+    def set_pool_size(self, pool_connections, pool_maxsize):
+        '''
+        Set the number of connection pools to cache and the maximum number of
+        connections to keep in each pool. Both default values are 10, you may
+        need a bigger `pool_maxsize` when access network resources in parallel.
+
+        Take effect when the session is opened.
+        '''
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+
+    def set_timeout(self, timeout, action=None):
+        '''
+        Set the timeout in seconds of requests, or of requests of the given
+        `action`, e.g. `GetCQRecordDetails`, if it is not None. A timeout may
+        also be a `(connect, read)` tuple. The default value None means no
+        timeout.
+        '''
+        if action is None:
+            self.timeout = timeout
+        else:
+            self.timeouts[action] = timeout
+
+    def set_throttle(self, throttle):
+        '''
+        Set the `throttle.AdaptiveLimiter` shared by all requests, the default
+        value None means no limit. `max_workers` and the connection pool size
+        of sessions opened later are raised to the max limit of `throttle`,
+        so parallel methods can reach it.
+        '''
+        self.throttle = throttle
+        if throttle is not None:
+            self.max_workers = max(self.max_workers, throttle.max_limit)
+            self.pool_maxsize = max(self.pool_maxsize, throttle.max_limit)
+
+    def set_retry_policy(self, policy):
+        '''
+        Set the `retry.RetryPolicy` for idempotent requests, set None to
+        disable retrying. The default policy retries `DoFindRecord`,
+        `GetCQRecordDetails` and other GET actions at most 3 times.
+        '''
+        self.retry_policy = policy
+
+    def set_decode_mode(self, mode):
+        '''
+        Set the `decode.DecodeMode` for JSON responses. The default mode is
+        `DecodeMode.AUTO`, use `decoder.stats()` to see how often the
+        `demjson` fallback is hit.
+        '''
+        self.decoder.mode = mode
+
+    def set_streaming(self, streaming):
+        '''
+        Set whether record details responses are parsed incrementally, only
+        the top-level keys and fields consumed by the target record class are
+        kept in memory. The default value is False.
+        '''
+        self.streaming = streaming
+
+    def set_default_fields(self, record_type, fields):
+        '''
+        Set the default field projection of `get_cq_record_details` for
+        records of `record_type`. The default value None parses all fields in
+        `field_parser_map` of the record class.
+        '''
+        if fields is None:
+            self.default_fields.pop(record_type, None)
+        else:
+            self.default_fields[record_type] = frozenset(fields)
+
+    def set_single_flight(self, enabled):
+        '''
+        Set whether concurrent identical `find_record` and
+        `get_cq_record_details` calls share one in-flight request. The
+        default value is True.
+        '''
+        self.single_flight = SingleFlight() if enabled else None
+
+    def set_query_page_size(self, page_size):
+        '''
+        Set the default number of rows per page of query results, the default
+        value is 100.
+        '''
+        self.query_page_size = page_size
+
+    def set_query_protocol(self, **options):
+        '''
+        Override items of `query_protocol` for this instance, e.g.
+        `set_query_protocol(action='RunQuery')`.
+        '''
+        unknown = set(options) - set(self.query_protocol)
+        if unknown:
+            raise ValueError('Unknown query protocol options %s.' %
+                             ', '.join(sorted(unknown)))
+        self.query_protocol = dict(self.query_protocol, **options)
+
+    def set_max_workers(self, max_workers):
+        '''
+        Set the default number of worker threads used by batch methods. The
+        default value is 8.
+        '''
+        self.max_workers = max_workers
+
+    def set_record_cache(self, cache):
+        '''
+        Set the `cache.RecordCache` consulted by `get_cq_record_details`. The
+        default cache is a `cache.LRUCache` of referenced record types, e.g.
+        customers and modules, so CRPs are always fetched fresh. Set None to
+        disable caching.
+        '''
+        self.record_cache = cache
+
+    def invalidate_record(self, resource_id, record_type=None):
+        '''
+        Remove the cached and stored record of `resource_id`, for all record
+        types if `record_type` is None.
+        '''
+        if self.record_store is not None:
+            self.record_store.invalidate(resource_id, record_type)
+        record_types = [record_type] if record_type else list(RecordType)
+        for rt in record_types:
+            if self.record_cache is not None:
+                self.record_cache.invalidate((resource_id, rt))
+            if self.identity_map is not None:
+                self.identity_map.invalidate((resource_id, rt))
+
+    def set_identity_map(self, identity_map):
+        '''
+        Set the `cache.IdentityMap` through which all records of the same
+        resource, e.g. the customer referenced by many CRPs, share one
+        instance while it is alive. The default map is per client, set a new
+        one to start a new scope, or None to disable sharing.
+
+        The map never serves a fetch, records are got through the record
+        cache, the record store or the network as usual, then the shared
+        instance is updated with the record got, see `IdentityMap.put`.
+        '''
+        self.identity_map = identity_map
+
+    def set_record_store(self, store):
+        '''
+        Set the persistent `store.RecordStore` consulted by
+        `get_cq_record_details` after the record cache. The default value None
+        means no store.
+        '''
+        self.record_store = store
+
+    def set_record_index(self, index):
+        '''
+        Set the `index.RecordIndex` of record id to resource id consulted by
+        `get_record`, and filled by `find_record` and record details. The
+        default index is in memory, set None to disable indexing.
+        '''
+        self.record_index = index
+
+    def set_lazy_references(self, lazy):
+        '''
+        Set whether referenced records, e.g. customer and module of a CRP,
+        are fetched on first attribute access instead of when the record is
+        fetched. The default value is False.
+
+        Lazy references need the session opened and logged in when they are
+        accessed, see also `prefetch_references`.
+        '''
+        self.lazy_references = lazy
+
     def open_session(self):
         '''
         You should call `open_session` to acquire a `requests.Session` object
@@ -48,7 +313,15 @@ class CQ(object):
         if self.session:
             logging.warning('Session already exist.')
 
+        # Imported on first use, it is slow to import.
+        import requests
+        from requests.adapters import HTTPAdapter
+
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
 
     def close_session(self):
         '''
@@ -60,6 +333,7 @@ class CQ(object):
             return
 
         self.session.close()
+        self.session = None
 
     def check_authenticated(self, cquid=None):
         '''
@@ -77,10 +351,8 @@ class CQ(object):
             'action': 'CheckAuthenticated',
             'cquid': cquid if cquid else self.cquid,
         }
-        path = self.path_map['LOGIN']
-        url = urllib.parse.urljoin(self.url, path)
-        resp = self.session.get(url, params=params)
-        jobj = self._check_response(resp)
+        resp = self._request('GET', 'LOGIN', params)
+        jobj = self._check_response(resp, params['action'])
         if jobj:
             status = jobj['STATUS']
             is_auth = jobj['isAuthenticated']
@@ -97,14 +369,12 @@ class CQ(object):
 
         dbs = []
 
-        path = self.path_map['LOGIN']
         params = {
             'action': 'DoGetDbSets',
             'cquid': self.cquid,
         }
-        url = urllib.parse.urljoin(self.url, path)
-        resp = self.session.get(url, params=params)
-        jobj = self._check_response(resp)
+        resp = self._request('GET', 'LOGIN', params)
+        jobj = self._check_response(resp, params['action'])
         if jobj:
             for item in jobj['items']:
                 dbs.append(item[jobj['identifier']])
@@ -114,12 +384,23 @@ class CQ(object):
         '''
         Login the session.
 
+        If a session file is set, see `set_session_file`, the saved session
+        of the same user and repository is reused if it is still
+        authenticated, otherwise the new session is saved after login.
+
         - Need access network resources.
         - No need login.
         '''
         self._ensure_session()
-        path = self.path_map['LOGIN']
-        url = urllib.parse.urljoin(self.url, path)
+        if self.auto_relogin:
+            self._credentials = (username, password, repository)
+        if self.session_file and \
+                self.restore_session(self.session_file, username, repository):
+            return True
+        with self._login_lock:
+            return self._login(username, password, repository)
+
+    def _login(self, username, password, repository):
         params = {
             'action': 'DoLogin',
         }
@@ -130,8 +411,8 @@ class CQ(object):
             'tzOffset': self.tz_offset,
             'cquid': self.cquid
         }
-        resp = self.session.post(url, params=params, data=data)
-        jobj = self._check_response(resp)
+        resp = self._request('POST', 'LOGIN', params, data)
+        jobj = self._check_response(resp, params['action'])
         if not jobj or jobj['status'] != 'true':
             return False
         self.cquid = jobj['cqUid']
@@ -140,6 +421,99 @@ class CQ(object):
         # TODO: update other inner data if needed.
 
         self.login_status = True
+        self._login_id = (username, repository)
+        self._login_generation += 1
+        if self.session_file:
+            self.save_session(self.session_file)
+        return True
+
+    def save_session(self, path):
+        '''
+        Save the authenticated state, i.e. `cquid`, `userdb`, `full_name` and
+        cookies of the session, to a file readable by the owner only.
+
+        - No need access network resources.
+        - Need login.
+        '''
+        self._ensure_session()
+        self._ensure_login()
+        username, repository = self._login_id
+        state = {
+            'url': self.url,
+            'loginId': username,
+            'repository': repository,
+            'cquid': self.cquid,
+            'userdb': self.userdb,
+            'fullName': self.full_name,
+            'cookies': [{
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'secure': cookie.secure,
+                'expires': cookie.expires,
+            } for cookie in self.session.cookies],
+        }
+        tmp_path = '%s.%d.tmp' % (path, os.getpid())
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def restore_session(self, path, username=None, repository=None):
+        '''
+        Restore the authenticated state saved by `save_session`, and check it
+        is still authenticated. If `username` or `repository` is given, the
+        saved state should be of the same user or repository.
+
+        Return True if the restored session is authenticated, otherwise False
+        and nothing is changed.
+
+        - Need access network resources.
+        - No need login.
+        '''
+        self._ensure_session()
+        from requests.cookies import RequestsCookieJar
+
+        try:
+            with open(path) as f:
+                state = json.load(f)
+            if state.get('url') != self.url or \
+                    username not in (None, state.get('loginId')) or \
+                    repository not in (None, state.get('repository')):
+                return False
+            jar = RequestsCookieJar()
+            for cookie in state['cookies']:
+                jar.set(cookie['name'], cookie['value'],
+                        domain=cookie['domain'], path=cookie['path'],
+                        secure=cookie['secure'], expires=cookie['expires'])
+            cquid = state['cquid']
+            userdb = state['userdb']
+            full_name = state['fullName']
+            login_id = (state['loginId'], state['repository'])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            logging.info('Saved session in %s is unreadable.', path)
+            return False
+        # The check is sent with the saved cookies, put back the current
+        # ones unless it succeeds.
+        cookies = self.session.cookies.copy()
+        self.session.cookies.update(jar)
+        is_auth = False
+        try:
+            _, is_auth = self.check_authenticated(cquid)
+        finally:
+            if is_auth not in (True, 'true'):
+                self.session.cookies.clear()
+                self.session.cookies.update(cookies)
+        if is_auth not in (True, 'true'):
+            logging.info('Saved session in %s expired.', path)
+            return False
+        self.cquid = cquid
+        self.userdb = userdb
+        self.full_name = full_name
+        self.login_status = True
+        self._login_id = login_id
+        self._login_generation += 1
         return True
 
     def logout(self):
@@ -150,17 +524,17 @@ class CQ(object):
         - Need login.
         '''
         self._ensure_session()
-        path = self.path_map['LOGIN']
-        url = urllib.parse.urljoin(self.url, path)
         params = {
             'action': 'DoLogout',
         }
         data = {
             'cquid': self.cquid,
         }
-        resp = self.session.post(url, params=params, data=data)
+        resp = self._request('POST', 'LOGIN', params, data)
         if self._check_response_status(resp):
             self._reset_fields()
+            if self.session_file and os.path.exists(self.session_file):
+                os.remove(self.session_file)
             return True
         return False
 
@@ -175,24 +549,38 @@ class CQ(object):
         '''
         self._ensure_session()
         self._ensure_login()
-        path = self.path_map['FIND']
-        url = urllib.parse.urljoin(self.url, path)
+        return self._coalesce(('DoFindRecord', record_id),
+                              self._find_record, record_id)
+
+    def _find_record(self, record_id):
         params = {
             'action': 'DoFindRecord',
             'recordId': record_id,
             'searchType': 'BY_RECORD_ID',
             'cquid': self.cquid,
         }
-        resp = self.session.get(url, params=params)
-        jobj = self._check_response(resp)
+        generation = self._login_generation
+        resp = self._request('GET', 'FIND', params)
+        jobj = self._check_response(resp, params['action'])
+        if self._is_status_expired(jobj, 'status', generation):
+            params['cquid'] = self.cquid
+            resp = self._request('GET', 'FIND', params)
+            jobj = self._check_response(resp, params['action'])
         if jobj:
             if jobj['status'] == 'true':
+                if self.record_index is not None:
+                    self.record_index.put(record_id, jobj['id'])
                 return jobj['id']
         return None
 
-    def get_cq_record_details(self, resource_id, record_type):
+    def get_record(self, record_id, record_type, fields=None, all_tabs=True):
         '''
-        Get the record details.
+        Get the record details by record id, see `get_cq_record_details` for
+        `fields` and `all_tabs`.
+
+        The resource id is looked up in the record index first, see
+        `set_record_index`, `find_record` is called only if it is not indexed
+        or the indexed record does not match.
 
         Return a `record.Record` instance or None.
 
@@ -201,29 +589,592 @@ class CQ(object):
         '''
         self._ensure_session()
         self._ensure_login()
+        resource_id = self._indexed_resource_id(record_id)
+        if resource_id is not None:
+            record = self.get_cq_record_details(
+                resource_id, record_type, fields, all_tabs)
+            if self._check_indexed_record(record_id, record):
+                return record
+        resource_id = self.find_record(record_id)
+        if resource_id is None:
+            return None
+        return self.get_cq_record_details(
+            resource_id, record_type, fields, all_tabs)
+
+    def get_cq_record_details(self, resource_id, record_type, fields=None,
+                              all_tabs=True):
+        '''
+        Get the record details.
+
+        Only fields named in `fields` are parsed, the default value is set by
+        `set_default_fields`. Data of all tabs is requested unless `all_tabs`
+        is False, in which case the server sends the default tab only.
+
+        Return a `record.Record` instance or None. The record cache and then
+        the record store are consulted first, see `set_record_cache` and
+        `set_record_store`. Only records fetched with all fields and all tabs
+        are put into cache and store.
+
+        - Need access network resources.
+        - Need login.
+        '''
+        record, key = self._lookup_cq_record_details(
+            resource_id, record_type, fields, all_tabs)
+        if key is None:
+            return record
+        return self._coalesce(key, self._get_cq_record_details, *key[1:])
+
+    def _get_cq_record_details(self, resource_id, record_type, fields,
+                               all_tabs):
+        jobj = self._load_cq_record_details(
+            resource_id, record_type, fields, all_tabs)
+        if jobj is None:
+            return None
+        record = self._parse_cq_record_details(
+            self, jobj, resource_id, record_type, fields, all_tabs)
+        if not self.lazy_references:
+            record.resolve_references()
+        self._cache_cq_record_details(
+            record, resource_id, record_type, fields, all_tabs)
+        return record
+
+    def _indexed_resource_id(self, record_id):
+        '''
+        Return the resource id of `record_id` in the record index or None.
+        '''
+        index = self.record_index
+        return index.get(record_id) if index is not None else None
+
+    def _check_indexed_record(self, record_id, record):
+        '''
+        Return True if `record`, got by the indexed resource id of
+        `record_id`, is the record of `record_id`, otherwise invalidate the
+        index entry and return False.
+        '''
+        if record is not None and record.display_name == record_id:
+            return True
+        logging.info('Index entry of %s is stale.', record_id)
+        index = self.record_index
+        if index is not None:
+            index.invalidate(record_id)
+        return False
+
+    def _lookup_cq_record_details(self, resource_id, record_type, fields,
+                                  all_tabs):
+        '''
+        Steps of `get_cq_record_details` before fetching, shared with
+        `AsyncCQ`.
+
+        Return `(record, None)` if the record is cached, otherwise
+        `(None, key)`, where `key` is `(action, resource_id, record_type,
+        fields, all_tabs)` of the fetch with the default `fields` applied.
+        '''
+        self._ensure_session()
+        self._ensure_login()
+        cache = self.record_cache
+        if cache is not None and resource_id and cache.caches(record_type):
+            record = cache.get((resource_id, record_type))
+            if record is not None:
+                return record, None
+        if fields is None:
+            fields = self.default_fields.get(record_type)
+        else:
+            fields = frozenset(fields)
+        return None, ('GetCQRecordDetails', resource_id, record_type, fields,
+                      all_tabs)
+
+    def _parse_cq_record_details(self, cq, jobj, resource_id, record_type,
+                                 fields, all_tabs):
+        '''
+        Steps of `get_cq_record_details` after fetching, shared with
+        `AsyncCQ`: parse `jobj` into a record whose `cq_ref` is `cq` without
+        resolving references, index the record and share it through the
+        identity map.
+
+        Return the shared record instance.
+        '''
+        # Check hooks once, one may be registered meanwhile.
+        hooks = self.hooks
+        start = time.perf_counter() if hooks else None
+        # Parse only, so parse time excludes fetching references.
+        record = Record.create_from_json_resp(
+            cq, jobj, record_type, True, fields)
+        if start is not None:
+            hooks.emit(instrument.AFTER_PARSE, {
+                'action': 'GetCQRecordDetails',
+                'record_type': record_type,
+                'resource_id': resource_id,
+                'elapsed': time.perf_counter() - start,
+            })
+        if self.record_index is not None and record.display_name:
+            self.record_index.put(record.display_name, resource_id)
+        identity_map = self.identity_map
+        if identity_map is not None and fields is None and all_tabs:
+            record = identity_map.put((resource_id, record_type), record)
+        return record
+
+    def _cache_cq_record_details(self, record, resource_id, record_type,
+                                 fields, all_tabs):
+        '''
+        Put `record` into the record cache if it has all fields and all tabs.
+        '''
+        cache = self.record_cache
+        if cache is not None and fields is None and all_tabs and \
+                cache.caches(record_type):
+            cache.put((resource_id, record_type), record)
+
+    def iter_records(self, record_ids, record_type, prefetch=None, fields=None,
+                     all_tabs=True):
+        '''
+        Get records of the iterable `record_ids` like `get_record`, with
+        `prefetch`, default `max_workers`, lookups in flight. The find, details
+        and referenced records fetches of later ids overlap with those of
+        earlier ids.
+
+        Return a generator of `batch.BatchResult` in input order, whose `key`
+        is the record id and `value` is a `record.Record` instance or None.
+        Ids are read from `record_ids` only as results are consumed.
+
+        - Need access network resources.
+        - Need login.
+        '''
+        self._ensure_session()
+        self._ensure_login()
+
+        def get_record(record_id):
+            return self.get_record(record_id, record_type, fields, all_tabs)
+
+        return iter_batch(get_record, record_ids,
+                          prefetch or self.max_workers)
+
+    def find_records(self, record_ids, max_workers=None, ordered=True):
+        '''
+        Get resource ids of many records in parallel.
+
+        Return a generator of `batch.BatchResult` whose `key` is the record id
+        and `value` is the resource id or None. Results are yielded in input
+        order if `ordered` is True, otherwise as soon as each is completed.
+
+        - Need access network resources.
+        - Need login.
+        '''
+        self._ensure_session()
+        self._ensure_login()
+        return run_batch(self.find_record, record_ids,
+                         max_workers or self.max_workers, ordered)
+
+    def get_records_details(self, resource_ids, record_type, max_workers=None,
+                            ordered=True, fields=None, all_tabs=True,
+                            fingerprints=None):
+        '''
+        Get details of many records in parallel, see `get_cq_record_details`
+        for `fields` and `all_tabs`.
+
+        Return a generator of `batch.BatchResult` whose `key` is the resource
+        id and `value` is a `record.Record` instance or None. Results are
+        yielded in input order if `ordered` is True, otherwise as soon as each
+        is completed.
+
+        If `fingerprints`, a `store.FingerprintStore`, is given, only results
+        of records changed since they were stored, and failed results, are
+        yielded, and fingerprints of changed records are stored. Records are
+        then fetched from the server, bypassing the record cache and store.
+        Use the same `fields` each time, fingerprints cover parsed fields
+        only.
+
+        - Need access network resources.
+        - Need login.
+        '''
+        self._ensure_session()
+        self._ensure_login()
+
+        def get_details(resource_id):
+            if fingerprints is not None:
+                self.invalidate_record(resource_id, record_type)
+            return self.get_cq_record_details(
+                resource_id, record_type, fields, all_tabs)
+
+        results = run_batch(get_details, resource_ids,
+                            max_workers or self.max_workers, ordered)
+        if fingerprints is None:
+            return results
+        return (result for result in results
+                if result.value is None or fingerprints.update(result.value))
+
+    def prefetch_references(self, records, max_workers=None):
+        '''
+        Fetch unresolved referenced records of many records in parallel. Each
+        distinct referenced record is fetched once.
+
+        - Need access network resources.
+        - Need login.
+        '''
+        self._ensure_session()
+        self._ensure_login()
+        pending = collections.OrderedDict()
+        for record in records:
+            if record is None:
+                continue
+            for attr_name, resource_id, record_type in \
+                    record.unresolved_references():
+                key = (resource_id, record_type)
+                pending.setdefault(key, []).append((record, attr_name))
+
+        def get_details(key):
+            return self.get_cq_record_details(*key)
+
+        for result in run_batch(get_details, pending,
+                                max_workers or self.max_workers):
+            if not result.ok:
+                # Keep unresolved, it will be fetched again on access.
+                logging.warning('Prefetch record %s failed: %s',
+                                result.key[0], result.error)
+                continue
+            for record, attr_name in pending[result.key]:
+                setattr(record, attr_name, result.value)
+
+    def execute_query(self, query_id, page_size=None, params=None,
+                      prefetch=True):
+        '''
+        Execute the saved query of resource id `query_id`, see
+        `query_protocol` for the request. Extra request parameters in `params`
+        e.g. filters of an ad-hoc query are sent as well.
+
+        Return a generator of result rows, i.e. dicts of column name to value.
+        Rows are fetched in pages of `page_size`, default set by
+        `set_query_page_size`, the next page is fetched in background while
+        rows of the current page are consumed if `prefetch` is True. At most
+        two pages are held in memory. Raise `CQError` if a page request
+        fails.
+
+        - Need access network resources.
+        - Need login.
+        '''
+        self._ensure_session()
+        self._ensure_login()
+
+        def rows():
+            for _, page in self._query_pages(query_id, page_size, params,
+                                             prefetch):
+                yield from page
+
+        return rows()
+
+    def query_records(self, query_id, record_type, page_size=None,
+                      params=None, key=None, max_workers=None, fields=None,
+                      all_tabs=True):
+        '''
+        Execute the query like `execute_query`, and get details of the result
+        records page by page like `get_records_details`, while the next page
+        is fetched in background. `key` is the column of resource ids, the
+        default is the `identifier` of query responses.
+
+        Return a generator of `batch.BatchResult` in the order of result
+        rows.
+
+        - Need access network resources.
+        - Need login.
+        '''
+        self._ensure_session()
+        self._ensure_login()
+
+        def results():
+            for identifier, page in self._query_pages(query_id, page_size,
+                                                      params, True):
+                column = key or identifier
+                if column is None:
+                    raise CQError('No identifier in query response, '
+                                  'key is needed.')
+                yield from self.get_records_details(
+                    [row[column] for row in page], record_type, max_workers,
+                    True, fields, all_tabs)
+
+        return results()
+
+    def _query_pages(self, query_id, page_size, params, prefetch):
+        '''
+        Generate `(identifier, rows)` of each page of query results.
+        '''
+        page_size = page_size or self.query_page_size
+        total_key = self.query_protocol['total_key']
+        executor = None
+        if prefetch:
+            executor = concurrent.futures.ThreadPoolExecutor(1)
+
+        def request_page(start):
+            if executor is None:
+                return lambda: self._fetch_query_page(
+                    query_id, start, page_size, params)
+            return executor.submit(self._fetch_query_page, query_id, start,
+                                   page_size, params).result
+
+        try:
+            start = 0
+            next_page = request_page(start)
+            while next_page is not None:
+                jobj, rows = next_page()
+                start += len(rows)
+                total = jobj.get(total_key)
+                if len(rows) < page_size or \
+                        (total is not None and start >= int(total)):
+                    next_page = None
+                else:
+                    next_page = request_page(start)
+                yield jobj.get('identifier'), rows
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def _fetch_query_page(self, query_id, start, count, params):
+        '''
+        Fetch one page of query results.
+
+        Return the response JSON object and its rows.
+        '''
+        protocol = self.query_protocol
+        req_params = {
+            'action': protocol['action'],
+            protocol['query_param']: query_id,
+            protocol['start_param']: start,
+            protocol['count_param']: count,
+            'cquid': self.cquid,
+        }
+        if params:
+            req_params.update(params)
+        generation = self._login_generation
+        resp = self._request('GET', 'QUERY', req_params)
+        jobj = self._check_response(resp, req_params['action'])
+        if self._is_status_expired(jobj, 'STATUS', generation):
+            req_params['cquid'] = self.cquid
+            resp = self._request('GET', 'QUERY', req_params)
+            jobj = self._check_response(resp, req_params['action'])
+        if not isinstance(jobj, dict) or \
+                str(jobj.get('STATUS', 'true')).lower() != 'true':
+            raise CQError('Query %s failed at row %d.' % (query_id, start))
+        return jobj, jobj.get(protocol['rows_key']) or []
+
+    def _coalesce(self, key, func, *args):
+        '''
+        Call `func(*args)`, share the call with concurrent callers of the same
+        `key` if single-flight is enabled.
+        '''
+        if self.single_flight is None:
+            return func(*args)
+        return self.single_flight.do(key, func, *args)
+
+    def _load_cq_record_details(self, resource_id, record_type, fields=None,
+                                all_tabs=True):
+        '''
+        Load the details json object of a record from the record store, or
+        fetch it if it is not stored or needs revalidation.
+
+        Return a JSON object or None.
+        '''
+        store = self.record_store
+        if store is None or fields is not None or not all_tabs or \
+                not resource_id:
+            return self._fetch_cq_record_details(
+                resource_id, record_type, fields, all_tabs)
+        jobj = store.get(resource_id, record_type)
+        if jobj is None:
+            jobj = self._fetch_cq_record_details(resource_id, record_type)
+            if jobj is not None:
+                store.put(resource_id, record_type, jobj)
+        return jobj
+
+    def _fetch_cq_record_details(self, resource_id, record_type=None,
+                                 fields=None, all_tabs=True):
+        '''
+        Fetch the raw details json object of a record.
+
+        In streaming mode, only the parts consumed by the record class of
+        `record_type` are kept, and only fields named in `fields` if it is not
+        None.
+
+        Return a JSON object or None.
+        '''
+        self._ensure_session()
+        self._ensure_login()
         if not resource_id:
             logging.warning('resource id of record is None, do nothing.')
             return None
-        path = self.path_map['DETAILS']
-        url = urllib.parse.urljoin(self.url, path)
         params = {
             'action': 'GetCQRecordDetails',
             'resourceId': resource_id,
             'state': 'VIEW',
-            'acceptAllTabsData': 'true',
+            'acceptAllTabsData': 'true' if all_tabs else 'false',
             'cquid': self.cquid,
         }
-        resp = self.session.get(url, params=params)
-        jobj = self._check_response(resp)
+        generation = self._login_generation
+        jobj = self._get_details(params, record_type, fields)
+        if self._is_status_expired(jobj, 'STATUS', generation):
+            params['cquid'] = self.cquid
+            jobj = self._get_details(params, record_type, fields)
         if not jobj or jobj['STATUS'] != 'true':
             return None
-        return Record.create_from_json_resp(self, jobj, record_type)
+        return jobj
+
+    def _request(self, method, path_name, params, data=None, stream=False):
+        '''
+        Send a request to the page `path_map[path_name]`, retry according to
+        the retry policy.
+
+        Return a `requests.Response` instance.
+        '''
+        url = urllib.parse.urljoin(self.url, self.path_map[path_name])
+        action = params['action']
+        timeout = self.timeouts.get(action, self.timeout)
+        policy = self.retry_policy
+        attempt = 0
+        relogged = False
+        while True:
+            generation = self._login_generation
+            try:
+                resp = self._throttled_send(method, url, action, params, data,
+                                            timeout, stream)
+            except _network_errors():
+                if policy is None or not policy.should_retry(action, attempt):
+                    raise
+                logging.warning('%s failed, retry.', action, exc_info=True)
+            else:
+                if not relogged and path_name != 'LOGIN' and \
+                        self.login_status and self._is_session_expired(resp):
+                    resp.close()
+                    self._relogin(generation)
+                    # Replay once with the cquid of the new session.
+                    relogged = True
+                    if 'cquid' in params:
+                        params = dict(params, cquid=self.cquid)
+                    continue
+                if policy is None or not policy.should_retry(
+                        action, attempt, resp.status_code):
+                    return resp
+                logging.warning('%s failed with status %d, retry.',
+                                action, resp.status_code)
+                resp.close()
+            time.sleep(policy.backoff(attempt))
+            attempt += 1
+
+    def _is_session_expired(self, resp):
+        '''
+        Return True if `resp` tells the session expired, i.e. the status is
+        401 or 403, or the request is redirected to the login page.
+        '''
+        if resp.status_code in (HTTPStatus.UNAUTHORIZED,
+                                HTTPStatus.FORBIDDEN):
+            return True
+        return bool(resp.history) and \
+            self.path_map['LOGIN'] in urllib.parse.urlsplit(resp.url).path
+
+    def _is_status_expired(self, jobj, status_key, generation):
+        '''
+        Return True if `jobj`, decoded from a response sent with the session
+        of login `generation`, has a false `status_key` status because the
+        session expired, after login again, see `_relogin`.
+
+        Some servers answer requests of an expired session with 200 and a
+        false status instead of 401, the expiry is confirmed with
+        `CheckAuthenticated`, so requests failed otherwise, e.g. of a record
+        not found, are not replayed.
+        '''
+        if not self.login_status or not isinstance(jobj, dict) or \
+                str(jobj.get(status_key)).lower() != 'false':
+            return False
+        if self._login_generation == generation:
+            _, is_auth = self.check_authenticated()
+            if is_auth in (True, 'true'):
+                return False
+        self._relogin(generation)
+        return True
+
+    def _relogin(self, generation):
+        '''
+        Login again after the session of login `generation` expired, unless
+        another thread already did.
+
+        Raise `SessionExpiredError` if there are no credentials or the login
+        fails.
+        '''
+        with self._login_lock:
+            if self._login_generation != generation:
+                return
+            credentials = self._credentials
+            if credentials is None:
+                self.login_status = False
+                raise SessionExpiredError('Session expired.')
+            logging.warning('Session expired, login again.')
+            self.cquid = str(uuid.uuid4())
+            if not self._login(*credentials):
+                self.relogin_failures += 1
+                self.login_status = False
+                raise SessionExpiredError('Session expired, login failed.')
+            self.relogins += 1
+
+    def _throttled_send(self, method, url, action, params, data, timeout,
+                        stream):
+        '''
+        Send one request within the limits of the throttle if any set.
+        '''
+        throttle = self.throttle
+        if throttle is None:
+            return self._send(method, url, action, params, data, timeout,
+                              stream)
+        token = throttle.acquire()
+        error = True
+        try:
+            resp = self._send(method, url, action, params, data, timeout,
+                              stream)
+            error = resp.status_code >= 500 or \
+                resp.status_code == HTTPStatus.TOO_MANY_REQUESTS
+            return resp
+        finally:
+            throttle.release(token, time.monotonic() - token, error, action)
+
+    def _send(self, method, url, action, params, data, timeout, stream):
+        '''
+        Send one request, call hooks if any registered.
+        '''
+        hooks = self.hooks
+        if not hooks:
+            return self.session.request(
+                method, url, params=params, data=data, timeout=timeout,
+                stream=stream)
+        hooks.emit(instrument.BEFORE_REQUEST,
+                   {'action': action, 'method': method})
+        start = time.perf_counter()
+        info = {
+            'action': action,
+            'method': method,
+            'status': None,
+            'bytes': None,
+            'error': None,
+        }
+        try:
+            resp = self.session.request(
+                method, url, params=params, data=data, timeout=timeout,
+                stream=stream)
+        except Exception as err:
+            info['error'] = err
+            raise
+        else:
+            info['status'] = resp.status_code
+            if stream:
+                length = resp.headers.get('Content-Length')
+                info['bytes'] = int(length) if length else None
+            else:
+                info['bytes'] = len(resp.content)
+            return resp
+        finally:
+            info['elapsed'] = time.perf_counter() - start
+            hooks.emit(instrument.AFTER_REQUEST, info)
 
     def _reset_fields(self):
         self.login_status = False
         self.cquid = str(uuid.uuid4())
         self.userdb = None
         self.full_name = None
+        self._login_id = (None, None)
+        self._credentials = None
         # TODO: reset other inner fields if needed.
 
     def _ensure_session(self):
@@ -241,7 +1192,7 @@ class CQ(object):
         if not self.login_status:
             raise NeedLoginError()
 
-    def _check_response(self, resp):
+    def _check_response(self, resp, action=None):
         '''
         Assume the response text is starts with `for(;;);` and followed well
         formatted json string.
@@ -249,13 +1200,74 @@ class CQ(object):
         Return a JSON object or None.
         '''
         jobj = None
-        if resp.status_code == requests.codes.ok:
-            res_patt = re.compile(r'for\(;;\);(.*)')
-            mat = re.match(res_patt, resp.text)
-            if mat:
-                jobj = demjson.decode(mat[1])
-            else:
-                jobj = demjson.decode(resp.text)
+        if resp.status_code == HTTPStatus.OK:
+            hooks = self.hooks
+            start = time.perf_counter() if hooks else None
+            jobj = self.decoder.decode(resp.content, resp.encoding)
+            if start is not None:
+                hooks.emit(instrument.AFTER_DECODE, {
+                    'action': action,
+                    'bytes': len(resp.content),
+                    'elapsed': time.perf_counter() - start,
+                })
+        return jobj
+
+    def _get_details(self, params, record_type=None, fields=None):
+        '''
+        Fetch record details, in streaming mode if it is enabled and
+        `record_type` is given.
+
+        Return a JSON object or None.
+        '''
+        if self.streaming and record_type is not None:
+            return self._get_streaming_details(params, record_type, fields)
+        resp = self._request('GET', 'DETAILS', params)
+        return self._check_response(resp, params['action'])
+
+    def _get_streaming_details(self, params, record_type, fields=None):
+        '''
+        Fetch record details in streaming mode.
+
+        Return a JSON object or None.
+        '''
+        resp = self._request('GET', 'DETAILS', params, stream=True)
+        try:
+            return self._check_streaming_response(resp, record_type, fields)
+        except ValueError:
+            logging.info('Streaming parse of %s failed, fall back.',
+                         params['resourceId'])
+        finally:
+            resp.close()
+        # Not strict JSON, fetch again and decode the whole body.
+        resp = self._request('GET', 'DETAILS', params)
+        return self._check_response(resp, params['action'])
+
+    def _check_streaming_response(self, resp, record_type, fields=None):
+        '''
+        Incrementally parse a details response opened with `stream=True`,
+        only keep the parts consumed by the record class of `record_type`,
+        and only fields named in `fields` if it is not None.
+
+        Return a JSON object or None. Raise `ValueError` if the response is
+        not strict JSON.
+        '''
+        if resp.status_code != HTTPStatus.OK:
+            return None
+        record_class = Record.record_class(record_type)
+        field_names = set(record_class.field_parser_map)
+        if fields is not None:
+            field_names.intersection_update(fields)
+        hooks = self.hooks
+        start = time.perf_counter() if hooks else None
+        jobj = parse_details(resp.iter_content(self.stream_chunk_size),
+                             resp.encoding, record_class.detail_keys,
+                             field_names)
+        if start is not None:
+            hooks.emit(instrument.AFTER_DECODE, {
+                'action': 'GetCQRecordDetails',
+                'bytes': None,
+                'elapsed': time.perf_counter() - start,
+            })
         return jobj
 
     def _check_response_status(self, resp):
@@ -264,7 +1276,7 @@ class CQ(object):
 
         Return True if status is ok, otherwise False.
         '''
-        if resp.status_code == requests.codes.ok:
+        if resp.status_code == HTTPStatus.OK:
             return True
         else:
             return False
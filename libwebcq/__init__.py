@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+'''
+Public API of libwebcq, each name is imported from its module on first
+access, so `import libwebcq` stays cheap.
+
+`CQ` and `AsyncCQ` share their names with their modules, import them with
+`from libwebcq.CQ import CQ` and `from libwebcq.AsyncCQ import AsyncCQ`.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import importlib
+
+# Map public name to the module defining it.
+_exports = {
+    'CQError': 'error',
+    'SessionError': 'error',
+    'SessionExpiredError': 'error',
+    'NeedLoginError': 'error',
+    'DataTypeError': 'error',
+    'Record': 'record',
+    'RecordType': 'record',
+    'CRPRecord': 'record',
+    'CustomerRecord': 'record',
+    'UserRecord': 'record',
+    'ModuleRecord': 'record',
+    'OwnerInfo': 'record',
+    'BatchResult': 'batch',
+    'RecordCache': 'cache',
+    'LRUCache': 'cache',
+    'IdentityMap': 'cache',
+    'DecodeMode': 'decode',
+    'JSONDecoder': 'decode',
+    'RetryPolicy': 'retry',
+    'RecordStore': 'store',
+    'FingerprintStore': 'store',
+    'RecordIndex': 'index',
+    'SingleFlight': 'singleflight',
+    'TokenBucket': 'throttle',
+    'AdaptiveLimiter': 'throttle',
+    'MetricsCollector': 'instrument',
+    'SyncEngine': 'sync',
+    'ShardedFetcher': 'parallel',
+    'export_records': 'export',
+}
+
+__all__ = sorted(_exports)
+
+
+def __getattr__(name):
+    module_name = _exports.get(name)
+    if module_name is None:
+        raise AttributeError(
+            'module %r has no attribute %r' % (__name__, name))
+    value = getattr(importlib.import_module('.' + module_name, __name__),
+                    name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
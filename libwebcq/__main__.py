@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+'''
+Command line interface of libwebcq.
+
+Export records to JSONL, CSV or Parquet:
+
+    python -m libwebcq export --url http://host/cqweb/ --user name \
+        --repository repo --ids ids.txt --output records.csv
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import argparse
+import getpass
+import logging
+import os
+import sys
+
+from .CQ import CQ
+from .export import FORMATS, export_records
+from .record import RecordType
+
+
+def _read_ids(args):
+    for record_id in args.record_ids:
+        yield record_id
+    if args.ids:
+        f = sys.stdin if args.ids == '-' else open(args.ids)
+        with f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield line
+
+
+def export(args):
+    password = args.password or os.environ.get('CQ_PASSWORD') or \
+        getpass.getpass('Password: ')
+    cq = CQ(args.url)
+    if args.max_workers:
+        cq.set_max_workers(args.max_workers)
+    if args.session_file:
+        cq.set_session_file(args.session_file)
+    cq.open_session()
+    try:
+        if not cq.login(args.user, password, args.repository):
+            sys.stderr.write('Login failed.\n')
+            return 1
+        result = export_records(
+            cq, _read_ids(args), args.output, args.format,
+            RecordType[args.record_type], args.chunk_size,
+            resume=not args.no_resume)
+        if not args.session_file:
+            cq.logout()
+    finally:
+        cq.close_session()
+    sys.stderr.write('Exported %d, skipped %d, failed %d records.\n' % (
+        result.exported, result.skipped, len(result.failed)))
+    for failed in result.failed:
+        sys.stderr.write('%s: %s\n' % (failed.key, failed.error or
+                                       'not found'))
+    return 2 if result.failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m libwebcq')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    export_parser = subparsers.add_parser(
+        'export', help='Export records to JSONL, CSV or Parquet.')
+    export_parser.add_argument('record_ids', nargs='*', metavar='RECORD_ID')
+    export_parser.add_argument('--url', required=True,
+                               help='Web CQ url, e.g. http://host/cqweb/.')
+    export_parser.add_argument('--user', required=True)
+    export_parser.add_argument(
+        '--password', help='Default $CQ_PASSWORD, or read from terminal.')
+    export_parser.add_argument('--repository', required=True)
+    export_parser.add_argument(
+        '--ids', help='File of record ids, one per line, - for stdin.')
+    export_parser.add_argument('--output', required=True)
+    export_parser.add_argument(
+        '--format', choices=FORMATS,
+        help='Default guessed from the extension of output.')
+    export_parser.add_argument(
+        '--record-type', default='CRP',
+        choices=[t.name for t in RecordType if t != RecordType.UNKNOWN])
+    export_parser.add_argument('--max-workers', type=int)
+    export_parser.add_argument('--chunk-size', type=int, default=100)
+    export_parser.add_argument(
+        '--session-file',
+        help='Reuse the login session saved in this file, keep it after.')
+    export_parser.add_argument(
+        '--no-resume', action='store_true',
+        help='Start over instead of resuming an interrupted export.')
+    export_parser.add_argument('-v', '--verbose', action='store_true')
+    export_parser.set_defaults(func=export)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
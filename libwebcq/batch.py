@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import collections
+import concurrent.futures
+import itertools
+
+
+class BatchResult(collections.namedtuple('BatchResult',
+                                         ['key', 'value', 'error'])):
+    '''
+    Result of one item in a batch operation.
+
+    `key` is the input item, `value` is the result of the item or None if an
+    exception is raised, in which case `error` holds the exception.
+    '''
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _call(func, key):
+    try:
+        return BatchResult(key, func(key), None)
+    except Exception as err:
+        return BatchResult(key, None, err)
+
+
+def run_batch(func, keys, max_workers, ordered=True):
+    '''
+    Call `func` for each item of `keys` in a thread pool.
+
+    Return a generator of `BatchResult`, in input order if `ordered` is True,
+    otherwise as soon as each item is completed. Exceptions raised by `func`
+    are captured in the result of that item instead of aborting the batch.
+    '''
+    keys = list(keys)
+    if not keys:
+        return
+    max_workers = max(1, min(max_workers, len(keys)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        futures = [executor.submit(_call, func, key) for key in keys]
+        try:
+            if ordered:
+                for future in futures:
+                    yield future.result()
+            else:
+                for future in concurrent.futures.as_completed(futures):
+                    yield future.result()
+        finally:
+            # Do not run remaining items when the consumer stops early.
+            for future in futures:
+                future.cancel()
+
+
+def iter_batch(func, keys, window):
+    '''
+    Call `func` for each item of the iterable `keys` in a thread pool, with
+    at most `window` items in flight.
+
+    Return a generator of `BatchResult` in input order. Items are taken from
+    `keys` only as results are consumed, so a slow consumer holds back the
+    producer and `keys` may be endless.
+    '''
+    window = max(1, window)
+    keys = iter(keys)
+    pending = collections.deque()
+    with concurrent.futures.ThreadPoolExecutor(window) as executor:
+        try:
+            for key in itertools.islice(keys, window):
+                pending.append(executor.submit(_call, func, key))
+            while pending:
+                result = pending.popleft().result()
+                # Refill the window before the consumer takes its time.
+                for key in itertools.islice(keys, 1):
+                    pending.append(executor.submit(_call, func, key))
+                yield result
+        finally:
+            # Do not run remaining items when the consumer stops early.
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+from abc import abstractmethod, ABC
+import collections
+import threading
+import time
+import weakref
+
+from .record import RecordType
+
+
+class RecordCache(ABC):
+    '''
+    Base class for caches of fetched records.
+
+    Keys are `(resource_id, record_type)` tuples, values are `record.Record`
+    instances. Only records of `record_types` are cached, all if it is None,
+    see `caches`. Implementations should be thread safe.
+    '''
+
+    def __init__(self, record_types=None):
+        self.record_types = None if record_types is None else \
+            frozenset(record_types)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def caches(self, record_type):
+        '''
+        Return True if records of `record_type` are cached.
+        '''
+        return self.record_types is None or record_type in self.record_types
+
+    @abstractmethod
+    def get(self, key):
+        '''
+        Return the cached value of `key` or None.
+        '''
+        pass
+
+    @abstractmethod
+    def put(self, key, value):
+        '''
+        Cache `value` for `key`.
+        '''
+        pass
+
+    @abstractmethod
+    def invalidate(self, key):
+        '''
+        Remove `key` from cache if it exists.
+        '''
+        pass
+
+    @abstractmethod
+    def clear(self):
+        '''
+        Remove all cached values.
+        '''
+        pass
+
+    def stats(self):
+        '''
+        Return a dict of counters.
+        '''
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class LRUCache(RecordCache):
+    '''
+    In-memory least recently used cache.
+
+    At most `max_size` values are kept, and each value expires `ttl` seconds
+    after it is put. A `ttl` of None means values never expire. By default
+    only record types referenced by other records are cached, whose records
+    are fetched again and again, pass `record_types=None` to cache all.
+    '''
+
+    def __init__(self, max_size=1024, ttl=300,
+                 record_types=(RecordType.CUSTOMER, RecordType.MODULE,
+                               RecordType.USER)):
+        super(LRUCache, self).__init__(record_types)
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expire_at = item
+            if expire_at is not None and expire_at <= time.monotonic():
+                del self._items[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        expire_at = None
+        if self.ttl is not None:
+            expire_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._items[key] = (value, expire_at)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class IdentityMap(object):
+    '''
+    Map of `(resource_id, record_type)` to the one shared record instance of
+    that resource, weakly referenced so unused records can be collected.
+
+    Only records of `record_types` are mapped, by default record types
+    referenced by other records, whose instances are shared the most.
+    '''
+
+    def __init__(self, record_types=(RecordType.CUSTOMER, RecordType.MODULE,
+                                     RecordType.USER)):
+        self.record_types = frozenset(record_types)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._records = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        return len(self._records)
+
+    def get(self, key):
+        '''
+        Return the live record of `key` or None.
+        '''
+        if key[1] not in self.record_types:
+            return None
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return record
+
+    def put(self, key, record):
+        '''
+        Map `key` to `record` unless a live record is mapped already, in which
+        case the live record is updated with the state of `record`, see
+        `record.Record.update`. Updates are serialized, so concurrent
+        refreshes of the same record do not interleave.
+
+        Return the shared record of `key`.
+        '''
+        if key[1] not in self.record_types:
+            return record
+        with self._lock:
+            shared = self._records.setdefault(key, record)
+            if shared is record:
+                self.misses += 1
+                return record
+            self.hits += 1
+            shared.update(record)
+            return shared
+
+    def invalidate(self, key):
+        '''
+        Remove `key` from the map if it exists, later fetches of `key` map a
+        new instance.
+        '''
+        with self._lock:
+            self._records.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def stats(self):
+        '''
+        Return a dict of counters.
+        '''
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._records),
+        }
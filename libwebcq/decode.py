@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+from enum import Enum
+import json
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+RESPONSE_PREFIX = b'for(;;);'
+
+
+class DecodeMode(Enum):
+    '''
+    Enum for JSON decode mode.
+    '''
+    # Strict JSON decoder first, `demjson` for non-strict JSON only.
+    AUTO = 'AUTO'
+    # Strict JSON decoder only.
+    STRICT = 'STRICT'
+    # `demjson` only.
+    DEMJSON = 'DEMJSON'
+
+
+def _fast_loads(content):
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class JSONDecoder(object):
+    '''
+    Decoder for web CQ JSON responses.
+
+    The strict decoder is `orjson` if installed or the standard `json` module,
+    both work on raw bytes. The pure-Python `demjson` is used for the
+    non-strict JSON web CQ sometimes sends.
+    '''
+
+    def __init__(self, mode=DecodeMode.AUTO):
+        self.mode = mode
+        self.fast_count = 0
+        self.fallback_count = 0
+        self._lock = threading.Lock()
+
+    def decode(self, content, encoding=None):
+        '''
+        Decode response body `content`, optional prefixed with `for(;;);`.
+
+        `content` is bytes encoded with `encoding`, which defaults to UTF-8.
+        '''
+        content = content.lstrip()
+        if content.startswith(RESPONSE_PREFIX):
+            content = content[len(RESPONSE_PREFIX):]
+        if encoding and encoding.lower().replace('-', '') != 'utf8':
+            content = content.decode(encoding)
+
+        if self.mode != DecodeMode.DEMJSON:
+            try:
+                jobj = _fast_loads(content)
+                self._count('fast_count')
+                return jobj
+            except ValueError:
+                if self.mode == DecodeMode.STRICT:
+                    raise
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        # Imported on first fallback, it is slow to import.
+        import demjson
+        jobj = demjson.decode(content)
+        self._count('fallback_count')
+        return jobj
+
+    def stats(self):
+        '''
+        Return a dict of counters.
+        '''
+        return {
+            'fast': self.fast_count,
+            'fallback': self.fallback_count,
+        }
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
@@ -19,6 +19,10 @@ class NeedLoginError(CQError):
         super(NeedLoginError, self).__init__('Should login first.')
 
 
+class SessionExpiredError(CQError):
+    '''Raised when the session expired and could not login again.'''
+
+
 class DataTypeError(CQError):
     '''
     Raised when data type not match.
@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import collections
+import csv
+from enum import Enum
+import functools
+import io
+import itertools
+import json
+import logging
+import os
+
+from .record import OwnerInfo, Record, RecordType
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+
+# Attributes holding a slotted object, flattened into one column per slot.
+_NESTED_FIELDS = {
+    'owner_info': OwnerInfo.__slots__,
+}
+
+ExportResult = collections.namedtuple(
+    'ExportResult', ['exported', 'skipped', 'failed'])
+
+
+@functools.lru_cache(maxsize=None)
+def columns(record_class):
+    '''
+    Return the tuple of column names of records of `record_class`, the same
+    for every record whichever values it has, see `flatten`.
+    '''
+    names = []
+    for name in record_class.value_names():
+        if name in _NESTED_FIELDS:
+            names.extend('%s_%s' % (name, slot)
+                         for slot in _NESTED_FIELDS[name])
+        else:
+            names.append(name)
+    return tuple(names)
+
+
+def flatten(record):
+    '''
+    Return an ordered dict of scalar values of `record`, with one entry per
+    column of `columns`, None for values the record does not have.
+
+    Referenced records are represented by their display names, nested values
+    e.g. owner info by one column per attribute, and lists by their items
+    joined with new lines.
+    '''
+    row = collections.OrderedDict()
+    for name in type(record).value_names():
+        value = getattr(record, name, None)
+        if name in _NESTED_FIELDS:
+            for slot in _NESTED_FIELDS[name]:
+                row['%s_%s' % (name, slot)] = getattr(value, slot, None)
+            continue
+        if isinstance(value, Record):
+            value = value.display_name
+        elif isinstance(value, (list, tuple)):
+            value = '\n'.join(str(item) for item in value)
+        elif isinstance(value, Enum):
+            value = value.name
+        row[name] = value
+    return row
+
+
+def guess_format(path):
+    '''
+    Return the export format of the output file `path` by its extension.
+    '''
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    if ext in ('jsonl', 'json', 'ndjson'):
+        return 'jsonl'
+    if ext in FORMATS:
+        return ext
+    raise ValueError('Unknown export format of %s.' % path)
+
+
+class _FileWriter(object):
+    '''
+    Base writer of one output file, truncated to `position` bytes, i.e. the
+    end of the last committed chunk, on open. Rows have the keys `columns`.
+    '''
+
+    def __init__(self, path, columns, position=0):
+        self._file = open(path, 'r+b' if position else 'wb')
+        self._file.truncate(position)
+        self._file.seek(position)
+
+    @staticmethod
+    def resumable(path, position):
+        '''
+        Return True if the output file `path` can be resumed at `position`.
+        '''
+        return os.path.isfile(path) and os.path.getsize(path) >= position
+
+    def commit(self):
+        '''
+        Make written rows durable.
+
+        Return the position to resume from.
+        '''
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+
+class JSONLWriter(_FileWriter):
+    '''
+    Write one JSON object per line.
+    '''
+
+    def write(self, rows):
+        for row in rows:
+            self._file.write(json.dumps(row, default=str).encode('utf-8'))
+            self._file.write(b'\n')
+
+
+class CSVWriter(_FileWriter):
+    '''
+    Write CSV with a header row of `columns`. A resumed file keeps the
+    columns of its header.
+    '''
+
+    def __init__(self, path, columns, position=0):
+        super(CSVWriter, self).__init__(path, columns, position)
+        if position:
+            self._file.seek(0)
+            header = next(csv.reader(
+                [self._file.readline().decode('utf-8')]), None)
+            self._file.seek(position)
+            columns = header or columns
+        self._text = io.TextIOWrapper(self._file, encoding='utf-8',
+                                      newline='', write_through=True)
+        self._writer = csv.DictWriter(self._text, columns,
+                                      extrasaction='ignore')
+        if not position:
+            self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._text.close()
+
+
+class ParquetWriter(object):
+    '''
+    Write a directory of Parquet files, one part file per committed chunk.
+    All part files have the same schema, one string column per column of
+    `columns`.
+
+    Need the optional dependency `pyarrow`.
+    '''
+
+    def __init__(self, path, columns, position=0):
+        if pyarrow is None:
+            raise ImportError('pyarrow is required to export Parquet.')
+        self.path = path
+        self.schema = pyarrow.schema(
+            [(name, pyarrow.string()) for name in columns])
+        self._parts = position
+        self._rows = []
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def resumable(path, position):
+        return all(os.path.isfile(os.path.join(path, 'part-%05d.parquet' % i))
+                   for i in range(position))
+
+    def write(self, rows):
+        self._rows.extend(
+            dict((name, None if value is None else str(value))
+                 for name, value in row.items()) for row in rows)
+
+    def commit(self):
+        if self._rows:
+            part_path = os.path.join(self.path,
+                                     'part-%05d.parquet' % self._parts)
+            tmp_path = part_path + '.tmp'
+            table = pyarrow.Table.from_pylist(self._rows, self.schema)
+            pyarrow.parquet.write_table(table, tmp_path)
+            os.replace(tmp_path, part_path)
+            self._parts += 1
+            self._rows = []
+        return self._parts
+
+    def close(self):
+        pass
+
+
+_WRITERS = {
+    'jsonl': JSONLWriter,
+    'csv': CSVWriter,
+    'parquet': ParquetWriter,
+}
+
+
+class _Progress(object):
+    '''
+    Progress of an export, kept in `<output>.progress` as one JSON line per
+    committed chunk with the resume position and the number of input record
+    ids done.
+    '''
+
+    def __init__(self, path, resume):
+        self.path = path + '.progress'
+        self.position = 0
+        self.count = 0
+        if resume and os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        chunk = json.loads(line)
+                        position, count = chunk['position'], chunk['count']
+                    except (ValueError, KeyError, TypeError):
+                        # Partially written by an interrupted export.
+                        break
+                    self.position = position
+                    self.count = count
+        self._file = open(self.path, 'a' if self.count else 'w')
+
+    def commit(self, position, count):
+        self._file.write(json.dumps({'position': position, 'count': count}))
+        self._file.write('\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.position = position
+        self.count = count
+
+    def reset(self):
+        '''
+        Forget the progress and start over.
+        '''
+        self._file.seek(0)
+        self._file.truncate()
+        self.position = 0
+        self.count = 0
+
+    def finish(self):
+        self._file.close()
+        os.remove(self.path)
+
+    def close(self):
+        self._file.close()
+
+
+def export_records(cq, record_ids, path, format=None,
+                   record_type=RecordType.CRP, chunk_size=100,
+                   max_workers=None, resume=True):
+    '''
+    Fetch records of `record_ids` in parallel with `cq.iter_records` and
+    stream flattened records, see `flatten`, to `path` in `format`, one of
+    `FORMATS`, guessed from the extension of `path` by default.
+
+    Records are written and committed in chunks of `chunk_size`, so memory
+    use does not grow with the number of exported records, only failed
+    results are kept. If `resume` is True, an export interrupted before is
+    resumed: as many record ids as were done are skipped, so `record_ids`
+    should be the same ids in the same order. The export starts over if the
+    output is missing or shorter than its progress.
+
+    Return an `ExportResult` of the number of exported and skipped records,
+    and a list of `batch.BatchResult` of failed or not found records.
+
+    - Need access network resources.
+    - Need login.
+    '''
+    format = format or guess_format(path)
+    writer_class = _WRITERS[format]
+    progress = _Progress(path, resume)
+    if progress.count and \
+            not writer_class.resumable(path, progress.position):
+        logging.warning('Output %s does not match its progress, start over.',
+                        path)
+        progress.reset()
+    record_ids = iter(record_ids)
+    skipped = sum(1 for _ in itertools.islice(record_ids, progress.count))
+    writer = writer_class(path, columns(Record.record_class(record_type)),
+                          progress.position)
+    exported = 0
+    failed = []
+    done = progress.count
+
+    def commit(rows):
+        writer.write(rows)
+        progress.commit(writer.commit(), done)
+
+    try:
+        rows = []
+        for result in cq.iter_records(record_ids, record_type, max_workers):
+            done += 1
+            if result.value is None:
+                logging.warning('Export record %s failed: %s',
+                                result.key, result.error or 'not found')
+                failed.append(result)
+                continue
+            rows.append(flatten(result.value))
+            if len(rows) >= chunk_size:
+                commit(rows)
+                exported += len(rows)
+                rows = []
+        if rows:
+            commit(rows)
+            exported += len(rows)
+    except BaseException:
+        writer.close()
+        progress.close()
+        raise
+    writer.close()
+    progress.finish()
+    return ExportResult(exported, skipped, failed)
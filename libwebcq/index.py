@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import os
+import sqlite3
+import threading
+import time
+
+
+class RecordIndex(object):
+    '''
+    SQLite index of record id, e.g. `CRP00001`, to resource id, persistent
+    unless `path` is `:memory:`.
+
+    Entries older than `max_age` seconds are stale, they never are if
+    `max_age` is None.
+    '''
+
+    def __init__(self, path=':memory:', max_age=None):
+        self.path = path
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        exists = os.path.exists(path)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if not exists and path != ':memory:':
+            os.chmod(path, 0o600)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS record_ids ('
+                'record_id TEXT PRIMARY KEY, '
+                'resource_id TEXT NOT NULL, '
+                'updated_at REAL NOT NULL)')
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM record_ids').fetchone()[0]
+
+    def get(self, record_id):
+        '''
+        Return the resource id of `record_id`, or None if not indexed or
+        stale.
+        '''
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT resource_id, updated_at FROM record_ids '
+                'WHERE record_id = ?', (record_id,)).fetchone()
+            if row is None or (self.max_age is not None and
+                               time.time() - row[1] > self.max_age):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, record_id, resource_id):
+        '''
+        Index `record_id` of `resource_id`.
+        '''
+        self.update([(record_id, resource_id)])
+
+    def update(self, items):
+        '''
+        Bulk load `items`, a dict or an iterable of (record id, resource id)
+        pairs.
+        '''
+        if isinstance(items, dict):
+            items = items.items()
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO record_ids VALUES (?, ?, ?)',
+                [(record_id, resource_id, now)
+                 for record_id, resource_id in items])
+
+    def invalidate(self, record_id):
+        '''
+        Remove the entry of `record_id`.
+        '''
+        with self._lock, self._conn:
+            self._conn.execute(
+                'DELETE FROM record_ids WHERE record_id = ?', (record_id,))
+
+    def clear(self):
+        '''
+        Remove all entries.
+        '''
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM record_ids')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self):
+        '''
+        Return a dict of counters.
+        '''
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import bisect
+import collections
+import sys
+import threading
+
+# Hook events, each hook is called with one dict argument.
+#
+# BEFORE_REQUEST: action, method.
+# AFTER_REQUEST: action, method, status (None on error), bytes (None if
+#     unknown), elapsed (seconds), error (None on success).
+# AFTER_DECODE: action, bytes, elapsed.
+# AFTER_PARSE: action, record_type, resource_id, elapsed.
+BEFORE_REQUEST = 'before_request'
+AFTER_REQUEST = 'after_request'
+AFTER_DECODE = 'after_decode'
+AFTER_PARSE = 'after_parse'
+
+EVENTS = (BEFORE_REQUEST, AFTER_REQUEST, AFTER_DECODE, AFTER_PARSE)
+
+
+class Hooks(object):
+    '''
+    Registry of instrumentation hooks.
+
+    A `Hooks` instance is false if no hook is registered, so callers can skip
+    building event data with a cheap `if hooks:` check.
+    '''
+
+    def __init__(self):
+        self._hooks = dict((event, []) for event in EVENTS)
+        self._count = 0
+
+    def __bool__(self):
+        return self._count > 0
+
+    def add(self, event, hook):
+        '''
+        Register `hook` for `event`.
+        '''
+        if event not in self._hooks:
+            raise ValueError('Unknown event %r.' % event)
+        self._hooks[event].append(hook)
+        self._count += 1
+
+    def remove(self, event, hook):
+        '''
+        Unregister `hook` for `event`.
+        '''
+        self._hooks[event].remove(hook)
+        self._count -= 1
+
+    def emit(self, event, info):
+        for hook in self._hooks[event]:
+            hook(info)
+
+
+class Histogram(object):
+    '''
+    Latency histogram with fixed bucket upper bounds in seconds.
+    '''
+
+    bounds = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        '''
+        Return the upper bound of the bucket holding quantile `q`, None for
+        the last unbounded bucket.
+        '''
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+            'buckets': dict(zip([str(b) for b in self.bounds] + ['inf'],
+                                self.buckets)),
+        }
+
+
+class MetricsCollector(object):
+    '''
+    In-process collector of per-action request latency, decode time, parse
+    time, status and byte counters, and the current limit and queue depth of
+    throttles.
+
+    Use `install` to register it on a `CQ` instance.
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = []
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.latency = collections.defaultdict(Histogram)
+            self.decode = collections.defaultdict(Histogram)
+            self.parse = collections.defaultdict(Histogram)
+            self.statuses = collections.defaultdict(collections.Counter)
+            self.errors = collections.Counter()
+            self.bytes = collections.Counter()
+
+    def install(self, cq):
+        '''
+        Register hooks of this collector on `cq`.
+        '''
+        cq.add_hook(AFTER_REQUEST, self.on_request)
+        cq.add_hook(AFTER_DECODE, self.on_decode)
+        cq.add_hook(AFTER_PARSE, self.on_parse)
+        self._clients.append(cq)
+
+    def uninstall(self, cq):
+        '''
+        Unregister hooks of this collector from `cq`.
+        '''
+        cq.remove_hook(AFTER_REQUEST, self.on_request)
+        cq.remove_hook(AFTER_DECODE, self.on_decode)
+        cq.remove_hook(AFTER_PARSE, self.on_parse)
+        self._clients.remove(cq)
+
+    def on_request(self, info):
+        action = info['action']
+        with self._lock:
+            self.latency[action].add(info['elapsed'])
+            if info['error'] is not None:
+                self.errors[action] += 1
+            else:
+                self.statuses[action][info['status']] += 1
+            if info['bytes']:
+                self.bytes[action] += info['bytes']
+
+    def on_decode(self, info):
+        with self._lock:
+            self.decode[info['action']].add(info['elapsed'])
+
+    def on_parse(self, info):
+        with self._lock:
+            self.parse[info['record_type'].name].add(info['elapsed'])
+
+    def snapshot(self):
+        '''
+        Return all metrics as a JSON serializable dict.
+        '''
+        with self._lock:
+            actions = set(self.latency) | set(self.decode)
+            return {
+                'actions': dict((action, {
+                    'latency': self.latency[action].to_dict(),
+                    'decode': self.decode[action].to_dict(),
+                    'statuses': dict((str(k), v) for k, v
+                                     in self.statuses[action].items()),
+                    'errors': self.errors[action],
+                    'bytes': self.bytes[action],
+                }) for action in actions),
+                'parse': dict((name, hist.to_dict())
+                              for name, hist in self.parse.items()),
+                'throttle': [cq.throttle.stats() for cq in self._clients
+                             if cq.throttle is not None],
+            }
+
+    def dump(self, stream=None):
+        '''
+        Write a human readable summary to `stream`, default `sys.stdout`.
+        '''
+        stream = stream or sys.stdout
+        snapshot = self.snapshot()
+        line = '%-20s %8s %8s %10s %10s %10s %10s\n'
+        stream.write(line % ('action', 'count', 'errors', 'mean(ms)',
+                             'p99(ms)', 'decode(ms)', 'bytes'))
+        for action, data in sorted(snapshot['actions'].items()):
+            latency = data['latency']
+            decode = data['decode']
+            stream.write(line % (
+                action, latency['count'], data['errors'],
+                _ms(latency['mean']), _ms(latency['p99']),
+                _ms(decode['mean']), data['bytes']))
+        for name, data in sorted(snapshot['parse'].items()):
+            stream.write('parse %-14s %8s %8s %10s %10s\n' % (
+                name, data['count'], '', _ms(data['mean']),
+                _ms(data['p99'])))
+        for data in snapshot['throttle']:
+            stream.write('throttle limit %d, in flight %d, queue depth %d\n'
+                         % (data['limit'], data['in_flight'],
+                            data['queue_depth']))
+
+
+def _ms(seconds):
+    if seconds is None:
+        return '-'
+    return '%.1f' % (seconds * 1000)
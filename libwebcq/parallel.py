@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import collections
+import concurrent.futures
+import itertools
+import logging
+import multiprocessing.util
+import os
+
+from .batch import BatchResult
+from .cache import IdentityMap
+from .error import CQError
+
+# The `CQ` instance of a worker process, or the error of its login.
+_worker_cq = None
+_worker_error = None
+
+
+def _init_worker(url, username, password, repository, configure):
+    global _worker_cq, _worker_error
+    from .CQ import CQ
+
+    cq = CQ(url)
+    cq.open_session()
+    if configure is not None:
+        configure(cq)
+    try:
+        if not cq.login(username, password, repository):
+            raise CQError('Login failed in worker process %d.' % os.getpid())
+    except Exception as err:
+        _worker_error = err
+        cq.close_session()
+        return
+    _worker_cq = cq
+    # atexit handlers do not run in worker processes, finalizers do.
+    multiprocessing.util.Finalize(cq, _close_worker, (cq,), exitpriority=10)
+
+
+def _close_worker(cq):
+    try:
+        cq.logout()
+    except Exception:
+        logging.warning('Logout in worker process %d failed.', os.getpid(),
+                        exc_info=True)
+    cq.close_session()
+
+
+def _fetch_shard(record_ids, record_type, threads):
+    if _worker_error is not None:
+        raise _worker_error
+    return [tuple(result) for result in _worker_cq.iter_records(
+        record_ids, record_type, prefetch=threads)]
+
+
+class ShardedFetcher(object):
+    '''
+    Fetch records in a pool of `processes` worker processes, default the CPU
+    count, so decoding and parsing records scale with cores.
+
+    Each worker process owns a `CQ` session logged in with the given
+    credentials, `configure(cq)`, a picklable function, is called before
+    login to configure it. Record ids are sharded in shards of `shard_size`,
+    each worker fetches a shard with `threads` lookups in flight, see
+    `CQ.iter_records`. Records are sent back pickled without `cq_ref`, with
+    referenced records resolved unless lazy references are configured.
+    Referenced records received from all workers share one instance per
+    resource through `identity_map`.
+    '''
+
+    def __init__(self, url, username, password, repository, processes=None,
+                 threads=4, shard_size=50, configure=None):
+        self.processes = processes or os.cpu_count() or 1
+        self.threads = threads
+        self.shard_size = shard_size
+        self.identity_map = IdentityMap()
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            self.processes, initializer=_init_worker,
+            initargs=(url, username, password, repository, configure))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        '''
+        Logout and stop worker processes.
+        '''
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def iter_records(self, record_ids, record_type):
+        '''
+        Get records of the iterable `record_ids` like `CQ.get_record`.
+
+        Return a generator of `batch.BatchResult` in input order. At most two
+        shards per process are in flight, ids are read from `record_ids` only
+        as results are consumed.
+        '''
+        record_ids = iter(record_ids)
+        pending = collections.deque()
+
+        def submit():
+            shard = list(itertools.islice(record_ids, self.shard_size))
+            if shard:
+                pending.append((shard, self._executor.submit(
+                    _fetch_shard, shard, record_type, self.threads)))
+
+        try:
+            for _ in range(self.processes * 2):
+                submit()
+            while pending:
+                shard, future = pending.popleft()
+                try:
+                    results = [BatchResult(*result)
+                               for result in future.result()]
+                    for result in results:
+                        if result.value is not None:
+                            self._share_references(result.value)
+                except Exception as err:
+                    results = [BatchResult(record_id, None, err)
+                               for record_id in shard]
+                submit()
+                yield from results
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def _share_references(self, record):
+        for attr_name, (resource_id, record_type) in \
+                record.references.items():
+            value = getattr(record, attr_name)
+            if value is not None:
+                setattr(record, attr_name, self.identity_map.put(
+                    (resource_id, record_type), value))
+
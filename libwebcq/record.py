@@ -5,10 +5,16 @@
 
 from abc import abstractmethod, ABC
 from enum import Enum
+import hashlib
+import inspect
+import json
 import re
 import sys
 
-from .error import DataTypeError
+from .error import CQError, DataTypeError
+
+_TEL_PATTERN = re.compile(r'Tel\s*:\s*(.*)')
+_EMAIL_PATTERN = re.compile(r'Email\s*:\s*(.*)')
 
 
 class OwnerInfo(object):
@@ -16,10 +22,80 @@ class OwnerInfo(object):
     A container for CRP owner information.
     '''
 
+    __slots__ = ('tel', 'email')
+
     def __init__(self, tel, email):
         self.tel = tel
         self.email = email
 
+    def __eq__(self, other):
+        if not isinstance(other, OwnerInfo):
+            return NotImplemented
+        return (self.tel, self.email) == (other.tel, other.email)
+
+    def __hash__(self):
+        return hash((self.tel, self.email))
+
+    def __repr__(self):
+        return 'OwnerInfo(%r, %r)' % (self.tel, self.email)
+
+
+_UNRESOLVED = object()
+# Slots of `Record` not holding parsed values.
+_INTERNAL_SLOTS = frozenset(['cq_ref', 'projection', 'references',
+                             'fingerprint'])
+
+
+def _jsonable(value):
+    if isinstance(value, Record):
+        return value.record_id
+    if hasattr(value, '__slots__'):
+        return dict((name, getattr(value, name)) for name in value.__slots__)
+    return str(value)
+
+
+class ReferenceField(object):
+    '''
+    Descriptor for a field referencing another record.
+
+    Only the resource id of the referenced record is kept at parse time, see
+    `Record.add_reference`. The referenced record is fetched through the
+    record's `cq_ref` on first attribute access, or is None if the record
+    has no `cq_ref`, e.g. unpickled.
+    '''
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.storage_name = '_' + name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = getattr(instance, self.storage_name, _UNRESOLVED)
+        if value is _UNRESOLVED:
+            ref = instance.references.get(self.name)
+            if ref is None or instance.cq_ref is None:
+                return None
+            value = instance.cq_ref.get_cq_record_details(*ref)
+            if inspect.isawaitable(value):
+                # `cq_ref` is an `AsyncCQ`, do not block the event loop.
+                value.close()
+                raise CQError(
+                    'Referenced record %s is not fetched, await '
+                    'AsyncCQ.prefetch_references first.' % self.name)
+            setattr(instance, self.storage_name, value)
+        return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.storage_name, value)
+
+    def is_resolved(self, instance):
+        '''
+        Return True if the referenced record of `instance` is fetched.
+        '''
+        return getattr(instance, self.storage_name,
+                       _UNRESOLVED) is not _UNRESOLVED
+
 
 class DataType(Enum):
     '''
@@ -54,13 +130,42 @@ class Record(ABC):
         RecordType.MODULE: 'ModuleRecord',
     }
 
-    cq_ref = None
-    record_type = RecordType.UNKNOWN
-    record_type_res_id = None
-    record_id = None
-    display_name = None
-    stable_location = None
-    record_state = None
+    # Top-level keys of a details json object consumed by `parse_jobj`.
+    detail_keys = ('STATUS', 'RecordId', 'DisplayName', 'StableLocation',
+                   'State', 'recordType', 'fields')
+    # Map field name to parser method name or attribute name. It is compiled
+    # to `_field_dispatch` once when a subclass is created.
+    field_parser_map = {}
+    _field_dispatch = {}
+
+    __slots__ = ('cq_ref', 'projection', 'record_type', 'record_type_res_id',
+                 'record_id', 'display_name', 'stable_location',
+                 'record_state', 'references', 'fingerprint', '__weakref__')
+
+    def __init_subclass__(cls, **kwargs):
+        super(Record, cls).__init_subclass__(**kwargs)
+        cls._field_dispatch = dict(
+            (field_name, cls._compile_field_parser(parser))
+            for field_name, parser in cls.field_parser_map.items())
+
+    @classmethod
+    def _compile_field_parser(cls, parser):
+        '''
+        Return a handler `handler(instance, field)` for the parser method or
+        attribute named `parser`.
+        '''
+        handler = getattr(cls, parser, None)
+        if callable(handler):
+            return handler
+
+        def set_attribute(instance, field):
+            # Same as `common_field_parser`, inlined for speed.
+            value = field['CurrentValue']
+            if field['DataType'] == 'INTEGER':
+                value = int(value)
+            setattr(instance, parser, value)
+
+        return set_attribute
 
     @staticmethod
     def common_field_parser(instance, field_name, field):
@@ -77,22 +182,40 @@ class Record(ABC):
         setattr(instance, field_name, value)
 
     @staticmethod
-    def create_from_json_resp(cq, jobj, record_type):
+    def create_from_json_resp(cq, jobj, record_type, lazy=False, fields=None):
         '''
         Convert the details json object to a Record instance.
 
-        The json object is parsed from network response.
+        The json object is parsed from network response. Referenced records
+        are fetched immediately, or on first access if `lazy` is True. Only
+        fields named in `fields` are parsed if it is not None.
+        '''
+        record = Record._new_record(cq, record_type)
+        # Parse jobj and fill XXXRecord instance.
+        record.parse_jobj(jobj, fields)
+        if not lazy:
+            record.resolve_references()
+        return record
+
+    @staticmethod
+    def record_class(record_type):
+        '''
+        Return the Record subclass of the given record type.
         '''
-        # Create specific record according to record type.
         record_class_name = Record._record_type_map[record_type]
         curr_module = sys.modules[__name__]
-        record_class = getattr(curr_module, record_class_name)
-        record = record_class()
+        return getattr(curr_module, record_class_name)
+
+    @staticmethod
+    def _new_record(cq, record_type):
+        '''
+        Create an empty record instance of the given record type.
+        '''
+        # Create specific record according to record type.
+        record = Record.record_class(record_type)()
         # Keep CQ reference for inner usage, e.g. fetch network resources if
         # needed.
         record.cq_ref = cq
-        # Parse jobj and fill XXXRecord instance.
-        record.parse_jobj(jobj)
         return record
 
     @staticmethod
@@ -104,12 +227,67 @@ class Record(ABC):
             raise DataTypeError(msg)
 
     def __init__(self, record_type):
+        self.cq_ref = None
+        # Names of parsed fields, None means all fields.
+        self.projection = None
         self.record_type = record_type
-
-    def parse_jobj(self, jobj):
+        self.record_type_res_id = None
+        self.record_id = None
+        self.display_name = None
+        self.stable_location = None
+        self.record_state = None
+        # Map attribute name to (resource id, record type) of the referenced
+        # record, filled during parsing.
+        self.references = {}
+        # Hash of parsed values, computed once by `parse_jobj`.
+        self.fingerprint = None
+
+    def __getstate__(self):
+        '''
+        Return the state for pickling, without `cq_ref` and unresolved
+        referenced records.
+        '''
+        state = {}
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if name == 'cq_ref' or name.startswith('__'):
+                    continue
+                value = getattr(self, name, _UNRESOLVED)
+                if value is not _UNRESOLVED:
+                    state[name] = value
+        return state
+
+    def __setstate__(self, state):
+        # Unpickled records are detached, unresolved references can not be
+        # fetched.
+        self.cq_ref = None
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def update(self, other):
+        '''
+        Replace the state of this record, except `cq_ref`, with the state of
+        `other`, a newer instance of the same record, so holders of this
+        instance see the new values.
+        '''
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if name == 'cq_ref' or name.startswith('__'):
+                    continue
+                try:
+                    setattr(self, name, getattr(other, name))
+                except AttributeError:
+                    # Not set in `other`, e.g. a field out of its projection.
+                    if hasattr(self, name):
+                        delattr(self, name)
+
+    def parse_jobj(self, jobj, fields=None):
         '''
         Parse common fields.
+
+        Type specific fields not in `fields` are skipped if it is not None.
         '''
+        self.projection = None if fields is None else frozenset(fields)
         self.record_id = jobj['RecordId']
         self.display_name = jobj['DisplayName']
         self.stable_location = jobj['StableLocation']
@@ -117,6 +295,15 @@ class Record(ABC):
         self.record_type_res_id = jobj['recordType']
         # Parse type specific fields.
         self.on_parse_jobj(jobj)
+        self.fingerprint = self._compute_fingerprint()
+
+    def _compute_fingerprint(self):
+        '''
+        Return a stable hash of `values`, equal for records with the same
+        parsed values.
+        '''
+        text = json.dumps(self.values(), sort_keys=True, default=_jsonable)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
 
     @abstractmethod
     def on_parse_jobj(self, jobj):
@@ -126,12 +313,125 @@ class Record(ABC):
         '''
         pass
 
+    def parse_fields(self, jobj):
+        '''
+        Parse items of `jobj['fields']` with the compiled `field_parser_map`,
+        skip fields not in projection.
+        '''
+        dispatch = self._field_dispatch
+        projection = self.projection
+        for field in jobj['fields']:
+            field_name = field['FieldName']
+            handler = dispatch.get(field_name)
+            if handler is None:
+                continue
+            if projection is not None and field_name not in projection:
+                continue
+            handler(self, field)
+
+    @classmethod
+    def value_names(cls):
+        '''
+        Return a list of names of values, see `values`, of records of this
+        class, whether parsed or not: slots first, then `ReferenceField`
+        attributes.
+        '''
+        names = []
+        references = []
+        for klass in reversed(cls.__mro__):
+            for name in klass.__dict__.get('__slots__', ()):
+                if name.startswith('_') or name in _INTERNAL_SLOTS:
+                    continue
+                names.append(name)
+            references.extend(name for name, attr in klass.__dict__.items()
+                              if isinstance(attr, ReferenceField))
+        return names + references
+
+    def values(self):
+        '''
+        Return a dict of parsed values, referenced records are represented by
+        their resource ids.
+        '''
+        values = {}
+        for cls in reversed(type(self).__mro__):
+            for name in cls.__dict__.get('__slots__', ()):
+                if name.startswith('_') or name in _INTERNAL_SLOTS:
+                    continue
+                values[name] = getattr(self, name, None)
+        for attr_name, (resource_id, _) in self.references.items():
+            values[attr_name] = resource_id
+        return values
+
+    def diff(self, other):
+        '''
+        Return a dict mapping names of values, see `values`, which differ
+        between this record and `other` to `(value of self, value of other)`.
+        '''
+        if self.fingerprint is not None and \
+                self.fingerprint == other.fingerprint:
+            return {}
+        values = self.values()
+        other_values = other.values()
+        return dict((name, (values.get(name), other_values.get(name)))
+                    for name in set(values) | set(other_values)
+                    if values.get(name) != other_values.get(name))
+
+    def add_reference(self, attr_name, resource_id, record_type):
+        '''
+        Remember a referenced record, it will be fetched into attribute
+        `attr_name`, which should be a `ReferenceField`, when references are
+        resolved or on first access.
+        '''
+        self.references[attr_name] = (resource_id, record_type)
+        # Drop the previous resolved value if any.
+        setattr(self, attr_name, _UNRESOLVED)
+
+    def unresolved_references(self):
+        '''
+        Return a list of `(attr_name, resource_id, record_type)` for
+        referenced records not fetched yet.
+        '''
+        cls = type(self)
+        return [(attr_name, resource_id, record_type)
+                for attr_name, (resource_id, record_type)
+                in self.references.items()
+                if not getattr(cls, attr_name).is_resolved(self)]
+
+    def resolve_references(self):
+        '''
+        Fetch all unresolved referenced records through `cq_ref`.
+        '''
+        for attr_name, resource_id, record_type in self.unresolved_references():
+            value = self.cq_ref.get_cq_record_details(resource_id, record_type)
+            setattr(self, attr_name, value)
+
+    async def async_resolve_references(self):
+        '''
+        Fetch all unresolved referenced records concurrently through `cq_ref`,
+        which should be an `AsyncCQ` instance.
+        '''
+        import asyncio
+
+        refs = self.unresolved_references()
+        values = await asyncio.gather(*[
+            self.cq_ref.get_cq_record_details(resource_id, record_type)
+            for _, resource_id, record_type in refs])
+        for (attr_name, _, _), value in zip(refs, values):
+            setattr(self, attr_name, value)
+
 
 class CRPRecord(Record):
     '''
     CRP type record.
     '''
 
+    customer = ReferenceField()
+    module = ReferenceField()
+
+    __slots__ = ('state', 'last_op_date', 'owner_info', 'open_duration',
+                 'version_base_on', 'id', 'customer_phone', 'custom_emails',
+                 'headline', '_customer', '_module')
+
     field_parser_map = {
         'ModuleName': 'parse_module_name_field',
         'State': 'state',
@@ -150,12 +450,10 @@ class CRPRecord(Record):
 
     def __init__(self):
         super(CRPRecord, self).__init__(RecordType.CRP)
-        self.module = None
         self.state = None
         self.last_op_date = None
         self.owner_info = None
         self.open_duration = None
-        self.customer = None
         self.version_base_on = None
         self.id = None
         self.customer_phone = None
@@ -163,17 +461,7 @@ class CRPRecord(Record):
         self.headline = None
 
     def on_parse_jobj(self, jobj):
-        for field in jobj['fields']:
-            field_name = field['FieldName']
-            if not field_name in self.field_parser_map:
-                continue
-            parser = self.field_parser_map[field_name]
-            if not hasattr(self, parser):
-                continue
-            if callable(getattr(self, parser)):
-                getattr(self, parser)(field)
-            else:
-                self.common_field_parser(self, parser, field)
+        self.parse_fields(jobj)
 
     def parse_owner_info_field(self, field):
         '''
@@ -181,22 +469,21 @@ class CRPRecord(Record):
         '''
         value = field['CurrentValue']
         values = value.split('\r\n')
-        tel = re.match(r'Tel\s*:\s*(.*)', values[0]).groups()[0]
-        email = re.match(r'Email\s*:\s*(.*)', values[1]).groups()[0]
+        tel = _TEL_PATTERN.match(values[0]).group(1)
+        email = _EMAIL_PATTERN.match(values[1]).group(1)
         self.owner_info = OwnerInfo(tel, email)
 
     def parse_customer_field(self, field):
         '''
         Parse customer information.
 
-        Return an instance of `CustomerRecord`.
+        The `customer` attribute will be an instance of `CustomerRecord`.
         '''
         self._check_data_type(
             field, DataType.RESOURCE,
             'Customer field data type should be RESOURCE.')
         record_id = field['RecordId']
-        self.customer = self.cq_ref.get_cq_record_details(
-            record_id, RecordType.CUSTOMER)
+        self.add_reference('customer', record_id, RecordType.CUSTOMER)
 
     def parse_custom_emails(self, field):
         '''
@@ -215,13 +502,12 @@ class CRPRecord(Record):
         '''
         Parse module name information.
 
-        Return an instance of `ModuleRecord`.
+        The `module` attribute will be an instance of `ModuleRecord`.
         '''
         self._check_data_type(
             field, DataType.RESOURCE, 'Module field data type should be RESOURCE.')
         record_id = field['RecordId']
-        self.module = self.cq_ref.get_cq_record_details(
-            record_id, RecordType.MODULE)
+        self.add_reference('module', record_id, RecordType.MODULE)
 
 
 class CustomerRecord(Record):
@@ -229,6 +515,8 @@ class CustomerRecord(Record):
     Customer type record.
     '''
 
+    __slots__ = ()
+
     def __init__(self):
         super(CustomerRecord, self).__init__(RecordType.CUSTOMER)
 
@@ -241,6 +529,8 @@ class UserRecord(Record):
     User type record.
     '''
 
+    __slots__ = ()
+
     def __init__(self):
         super(UserRecord, self).__init__(RecordType.USER)
 
@@ -253,6 +543,8 @@ class ModuleRecord(Record):
     Module type record.
     '''
 
+    __slots__ = ()
+
     def __init__(self):
         super(ModuleRecord, self).__init__(RecordType.MODULE)
 
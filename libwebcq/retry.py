@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import random
+
+
+class RetryPolicy(object):
+    '''
+    Retry policy for idempotent web CQ actions.
+
+    A request of one of `actions` is retried at most `max_retries` times when
+    the connection fails, times out or the response status is one of
+    `statuses`. The delay before the n-th retry is drawn from an exponential
+    backoff `backoff_factor * 2 ** n` capped by `max_backoff`, with full
+    jitter if `jitter` is True.
+    '''
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30,
+                 jitter=True, statuses=(500, 502, 503, 504),
+                 actions=('CheckAuthenticated', 'DoGetDbSets',
+                          'DoFindRecord', 'GetCQRecordDetails',
+                          'ExecuteQuery')):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.actions = frozenset(actions)
+
+    def should_retry(self, action, attempt, status_code=None):
+        '''
+        Return True if the `attempt`-th (from 0) request of `action` should be
+        retried. `status_code` is None if the request raised an error.
+        '''
+        if action not in self.actions or attempt >= self.max_retries:
+            return False
+        return status_code is None or status_code in self.statuses
+
+    def backoff(self, attempt):
+        '''
+        Return the delay in seconds before retrying the `attempt`-th request.
+        '''
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def _field_value(jobj, field_name):
+    for field in jobj.get('fields') or ():
+        if field.get('FieldName') == field_name:
+            return field.get('CurrentValue')
+    return None
+
+
+class RecordStore(object):
+    '''
+    Persistent SQLite store of record details json objects.
+
+    A stored record is served without network access for `max_age` seconds
+    after it is fetched, or forever if its `State` field is one of
+    `final_states`, e.g. closed records that never change again. Older
+    records need revalidation, i.e. fetching again; if `LastOpDate` and
+    `State` are not changed only the fetch time is updated.
+    '''
+
+    def __init__(self, path, max_age=3600, final_states=()):
+        self.path = path
+        self.max_age = max_age
+        self.final_states = frozenset(final_states)
+        self.hits = 0
+        self.misses = 0
+        self.stales = 0
+        self._lock = threading.Lock()
+        exists = os.path.exists(path)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if not exists and path != ':memory:':
+            os.chmod(path, 0o600)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS records ('
+                'resource_id TEXT NOT NULL, '
+                'record_type TEXT NOT NULL, '
+                'display_name TEXT, '
+                'state TEXT, '
+                'last_op_date TEXT, '
+                'fetched_at REAL NOT NULL, '
+                'details TEXT NOT NULL, '
+                'PRIMARY KEY (resource_id, record_type))')
+
+    def get(self, resource_id, record_type):
+        '''
+        Return the stored details json object if it needs no revalidation,
+        otherwise None.
+        '''
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT state, fetched_at, details FROM records '
+                'WHERE resource_id = ? AND record_type = ?',
+                (resource_id, record_type.name)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            state, fetched_at, details = row
+            if state not in self.final_states and \
+                    time.time() - fetched_at > self.max_age:
+                self.stales += 1
+                return None
+            self.hits += 1
+        return json.loads(details)
+
+    def put(self, resource_id, record_type, jobj):
+        '''
+        Store the details json object of a record just fetched.
+        '''
+        state = _field_value(jobj, 'State')
+        last_op_date = _field_value(jobj, 'LastOpDate')
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT state, last_op_date FROM records '
+                'WHERE resource_id = ? AND record_type = ?',
+                (resource_id, record_type.name)).fetchone()
+            if row is not None and last_op_date is not None and \
+                    row == (state, last_op_date):
+                self._conn.execute(
+                    'UPDATE records SET fetched_at = ? '
+                    'WHERE resource_id = ? AND record_type = ?',
+                    (now, resource_id, record_type.name))
+                return
+            self._conn.execute(
+                'INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (resource_id, record_type.name, jobj.get('DisplayName'),
+                 state, last_op_date, now, json.dumps(jobj, default=str)))
+
+    def invalidate(self, resource_id, record_type=None):
+        '''
+        Remove the stored record of `resource_id`, for all record types if
+        `record_type` is None.
+        '''
+        with self._lock, self._conn:
+            if record_type is None:
+                self._conn.execute(
+                    'DELETE FROM records WHERE resource_id = ?',
+                    (resource_id,))
+            else:
+                self._conn.execute(
+                    'DELETE FROM records '
+                    'WHERE resource_id = ? AND record_type = ?',
+                    (resource_id, record_type.name))
+
+    def clear(self):
+        '''
+        Remove all stored records.
+        '''
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM records')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self):
+        '''
+        Return a dict of counters.
+        '''
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stales': self.stales,
+        }
+
+
+class FingerprintStore(object):
+    '''
+    Persistent SQLite store of record fingerprints, see
+    `record.Record.fingerprint`, to tell which records changed since they
+    were seen last time.
+    '''
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self.changed = 0
+        self.unchanged = 0
+        self._lock = threading.Lock()
+        exists = os.path.exists(path)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if not exists and path != ':memory:':
+            os.chmod(path, 0o600)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS fingerprints ('
+                'resource_id TEXT NOT NULL, '
+                'record_type TEXT NOT NULL, '
+                'fingerprint TEXT NOT NULL, '
+                'seen_at REAL NOT NULL, '
+                'PRIMARY KEY (resource_id, record_type))')
+
+    def get(self, resource_id, record_type):
+        '''
+        Return the stored fingerprint of a record, or None.
+        '''
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT fingerprint FROM fingerprints '
+                'WHERE resource_id = ? AND record_type = ?',
+                (resource_id, record_type.name)).fetchone()
+        return row[0] if row else None
+
+    def update(self, record):
+        '''
+        Store the fingerprint of `record`.
+
+        Return True if the record is new or its fingerprint changed.
+        '''
+        key = (record.record_id, record.record_type.name)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT fingerprint FROM fingerprints '
+                'WHERE resource_id = ? AND record_type = ?', key).fetchone()
+            if row is not None and row[0] == record.fingerprint:
+                self.unchanged += 1
+                return False
+            self._conn.execute(
+                'INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?)',
+                key + (record.fingerprint, time.time()))
+            self.changed += 1
+            return True
+
+    def invalidate(self, resource_id, record_type=None):
+        '''
+        Remove the stored fingerprint of `resource_id`, for all record types
+        if `record_type` is None.
+        '''
+        with self._lock, self._conn:
+            if record_type is None:
+                self._conn.execute(
+                    'DELETE FROM fingerprints WHERE resource_id = ?',
+                    (resource_id,))
+            else:
+                self._conn.execute(
+                    'DELETE FROM fingerprints '
+                    'WHERE resource_id = ? AND record_type = ?',
+                    (resource_id, record_type.name))
+
+    def clear(self):
+        '''
+        Remove all stored fingerprints.
+        '''
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM fingerprints')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self):
+        '''
+        Return a dict of counters.
+        '''
+        return {
+            'changed': self.changed,
+            'unchanged': self.unchanged,
+        }
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r'\s*')
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_SCALAR = re.compile(r'[^,}\]\s]*')
+
+
+class _Reader(object):
+    '''
+    Incremental reader of a JSON text from an iterable of byte chunks.
+
+    Only the unconsumed part of the text is kept in memory, from `mark` if
+    it is set, otherwise from `pos`.
+    '''
+
+    def __init__(self, chunks, encoding):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder(encoding or 'utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.mark = None
+        self.eof = False
+
+    def fill(self):
+        '''
+        Read more text, raise `ValueError` at end of input.
+        '''
+        if self.eof:
+            raise ValueError('Unexpected end of JSON input.')
+        start = self.pos if self.mark is None else self.mark
+        self.buf = self.buf[start:]
+        self.pos -= start
+        if self.mark is not None:
+            self.mark = 0
+        text = ''
+        while not text:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.eof = True
+                text = self.decoder.decode(b'', final=True)
+                break
+            text = self.decoder.decode(chunk)
+        self.buf += text
+
+    def peek(self):
+        '''
+        Skip whitespaces and return the next char or '' at end of input.
+        '''
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ''
+            self.fill()
+
+    def expect(self, chars):
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError('Expect one of %r at %d, got %r.' %
+                             (chars, self.pos, ch))
+        self.pos += 1
+        return ch
+
+    def skip_prefix(self, prefix):
+        self.peek()
+        while len(self.buf) - self.pos < len(prefix) and not self.eof:
+            self.fill()
+        if self.buf.startswith(prefix, self.pos):
+            self.pos += len(prefix)
+
+    def read_raw(self):
+        '''
+        Return the text of the next JSON value.
+        '''
+        self.peek()
+        self.mark = self.pos
+        self.skip_value()
+        text = self.buf[self.mark:self.pos]
+        self.mark = None
+        return text
+
+    def decode_value(self):
+        '''
+        Decode and return the next JSON value.
+        '''
+        return json.loads(self.read_raw())
+
+    def skip_value(self):
+        '''
+        Skip the next JSON value without materializing it.
+        '''
+        ch = self.peek()
+        if not ch:
+            raise ValueError('Unexpected end of JSON input.')
+        if ch not in '{["':
+            while True:
+                self.pos = _SCALAR.match(self.buf, self.pos).end()
+                if self.pos < len(self.buf) or self.eof:
+                    return
+                self.fill()
+        depth = 0
+        while True:
+            mat = _STRUCTURE.search(self.buf, self.pos)
+            if mat is None:
+                self.pos = len(self.buf)
+                self.fill()
+                continue
+            self.pos = mat.end()
+            ch = mat.group()
+            if ch == '"':
+                self._skip_string_tail()
+            elif ch in '[{':
+                depth += 1
+                continue
+            else:
+                depth -= 1
+            if depth == 0:
+                return
+
+    def _skip_string_tail(self):
+        while True:
+            mat = _STRING_TAIL.match(self.buf, self.pos)
+            if mat is not None:
+                self.pos = mat.end()
+                return
+            # No closing quote yet, drop the scanned text but keep trailing
+            # backslashes, they may escape the first char of the next chunk.
+            end = len(self.buf)
+            while end > self.pos and self.buf[end - 1] == '\\':
+                end -= 1
+            self.pos = end
+            self.fill()
+
+
+def _parse_field(reader, field_names):
+    '''
+    Return the next field object if its `FieldName` is in `field_names`,
+    otherwise skip it and return None.
+
+    Values after `FieldName` of an unwanted field are skipped without being
+    materialized, values before it are kept as raw text until it is known.
+    '''
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.pos += 1
+        return None
+    field = {}
+    pending = []
+    wanted = None
+    while True:
+        if reader.peek() != '"':
+            raise ValueError('Expect object key at %d.' % reader.pos)
+        key = reader.decode_value()
+        reader.expect(':')
+        if key == 'FieldName' and wanted is None:
+            name = reader.decode_value()
+            wanted = name in field_names
+            if wanted:
+                for pending_key, text in pending:
+                    field[pending_key] = json.loads(text)
+                field[key] = name
+            pending = None
+        elif wanted is None:
+            pending.append((key, reader.read_raw()))
+        elif wanted:
+            field[key] = reader.decode_value()
+        else:
+            reader.skip_value()
+        if reader.expect(',}') == '}':
+            return field if wanted else None
+
+
+def _parse_fields(reader, field_names):
+    fields = []
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+        return fields
+    while True:
+        if reader.peek() == '{':
+            field = _parse_field(reader, field_names)
+            if field is not None:
+                fields.append(field)
+        else:
+            reader.skip_value()
+        if reader.expect(',]') == ']':
+            return fields
+
+
+def parse_details(chunks, encoding, keys, field_names):
+    '''
+    Incrementally parse a `GetCQRecordDetails` response body.
+
+    `chunks` is an iterable of raw bytes of the response body. Only top-level
+    entries whose key is in `keys` are materialized, and only items of the
+    `fields` entry whose `FieldName` is in `field_names`, or all items if
+    `field_names` is None.
+
+    Return a JSON object. Raise `ValueError` if the body is not strict JSON.
+    '''
+    reader = _Reader(chunks, encoding)
+    reader.skip_prefix('for(;;);')
+    jobj = {}
+    reader.expect('{')
+    if reader.peek() == '}':
+        return jobj
+    while True:
+        if reader.peek() != '"':
+            raise ValueError('Expect object key at %d.' % reader.pos)
+        key = reader.decode_value()
+        reader.expect(':')
+        if key == 'fields' and field_names is not None:
+            jobj[key] = _parse_fields(reader, field_names)
+        elif key in keys or key == 'fields':
+            jobj[key] = reader.decode_value()
+        else:
+            reader.skip_value()
+        if reader.expect(',}') == '}':
+            return jobj
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import collections
+from enum import Enum
+import sqlite3
+import time
+
+from .record import RecordType
+
+
+class ChangeType(Enum):
+    '''
+    Enum for change type of a synchronized record.
+    '''
+    ADDED = 'ADDED'
+    CHANGED = 'CHANGED'
+    UNCHANGED = 'UNCHANGED'
+    FAILED = 'FAILED'
+
+
+SyncEvent = collections.namedtuple(
+    'SyncEvent', ['change_type', 'record_id', 'record', 'error'])
+
+
+def content_hash(record):
+    '''
+    Return a hash of all parsed values of `record`, i.e. its fingerprint.
+    '''
+    if record.fingerprint is None:
+        return record._compute_fingerprint()
+    return record.fingerprint
+
+
+class SyncEngine(object):
+    '''
+    Incrementally mirror records of one record type.
+
+    The checkpoint, i.e. the last sync time and the resource id, LastOpDate,
+    state and content hash of each synchronized record, is kept in a SQLite
+    database at `checkpoint_path`. Records are synchronized in batches of
+    `batch_size`, a batch is committed once all its events are consumed, so
+    an interrupted sync resumes from the last committed batch.
+    '''
+
+    def __init__(self, cq, checkpoint_path, record_type=RecordType.CRP,
+                 batch_size=100, final_states=()):
+        self.cq = cq
+        self.record_type = record_type
+        self.batch_size = batch_size
+        # Records in these states are not fetched again once synchronized.
+        self.final_states = frozenset(final_states)
+        self._conn = sqlite3.connect(checkpoint_path)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS checkpoint ('
+                'record_id TEXT PRIMARY KEY, '
+                'resource_id TEXT NOT NULL, '
+                'state TEXT, '
+                'last_op_date TEXT, '
+                'content_hash TEXT NOT NULL, '
+                'synced_at REAL NOT NULL)')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS progress ('
+                'record_id TEXT PRIMARY KEY)')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS meta ('
+                'key TEXT PRIMARY KEY, value TEXT)')
+
+    @property
+    def last_sync_time(self):
+        '''
+        Start time of the last completed sync, as seconds since the epoch, or
+        None if never synchronized.
+        '''
+        return self._get_meta('last_sync_time')
+
+    def close(self):
+        self._conn.close()
+
+    def sync(self, record_ids):
+        '''
+        Synchronize records of `record_ids`, typically ids of records changed
+        since `last_sync_time`, or all ids of interest.
+
+        Return a generator of `SyncEvent`. Records synchronized by an
+        interrupted previous call are skipped. Records in `final_states` are
+        not fetched again, their events are `UNCHANGED` with record None.
+
+        - Need access network resources.
+        - Need login.
+        '''
+        started = self._get_meta('run_started')
+        if started is None:
+            started = time.time()
+            self._set_meta('run_started', started)
+        done = set(row[0] for row in self._conn.execute(
+            'SELECT record_id FROM progress'))
+        pending = []
+        for record_id in collections.OrderedDict.fromkeys(record_ids):
+            if record_id in done:
+                continue
+            pending.append(record_id)
+            if len(pending) >= self.batch_size:
+                yield from self._sync_batch(pending)
+                pending = []
+        if pending:
+            yield from self._sync_batch(pending)
+
+        with self._conn:
+            self._conn.execute('DELETE FROM progress')
+            self._conn.execute("DELETE FROM meta WHERE key = 'run_started'")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('last_sync_time', ?)",
+                (str(started),))
+
+    def _sync_batch(self, record_ids):
+        checkpoints = {}
+        for record_id in record_ids:
+            row = self._conn.execute(
+                'SELECT resource_id, state, last_op_date, content_hash '
+                'FROM checkpoint WHERE record_id = ?', (record_id,)).fetchone()
+            if row is not None:
+                checkpoints[record_id] = row
+
+        events = []
+        unknown = [rid for rid in record_ids if rid not in checkpoints]
+        resource_ids = {}
+        for record_id, row in checkpoints.items():
+            if row[1] in self.final_states:
+                events.append(SyncEvent(ChangeType.UNCHANGED, record_id,
+                                        None, None))
+            else:
+                resource_ids[record_id] = row[0]
+        for result in self.cq.find_records(unknown):
+            if result.ok and result.value:
+                resource_ids[result.key] = result.value
+            else:
+                events.append(SyncEvent(ChangeType.FAILED, result.key, None,
+                                        result.error or LookupError(
+                                            'Record not found.')))
+
+        for resource_id in resource_ids.values():
+            self.cq.invalidate_record(resource_id, self.record_type)
+        record_id_of = dict((v, k) for k, v in resource_ids.items())
+        rows = []
+        for result in self.cq.get_records_details(
+                list(resource_ids.values()), self.record_type):
+            record_id = record_id_of[result.key]
+            record = result.value
+            if record is None:
+                events.append(SyncEvent(ChangeType.FAILED, record_id, None,
+                                        result.error or LookupError(
+                                            'Record not found.')))
+                continue
+            state = getattr(record, 'state', None)
+            last_op_date = getattr(record, 'last_op_date', None)
+            digest = content_hash(record)
+            old = checkpoints.get(record_id)
+            if old is None:
+                change_type = ChangeType.ADDED
+            elif old[2] == last_op_date and old[3] == digest:
+                change_type = ChangeType.UNCHANGED
+            else:
+                change_type = ChangeType.CHANGED
+            events.append(SyncEvent(change_type, record_id, record, None))
+            rows.append((record_id, result.key, state, last_op_date, digest,
+                         time.time()))
+
+        for event in events:
+            yield event
+        # All events of this batch are consumed, commit it.
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO checkpoint VALUES (?, ?, ?, ?, ?, ?)',
+                rows)
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO progress VALUES (?)',
+                [(record_id,) for record_id in record_ids])
+
+    def _get_meta(self, key):
+        row = self._conn.execute(
+            'SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return float(row[0]) if row else None
+
+    def _set_meta(self, key, value):
+        with self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                               (key, str(value)))
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import threading
+import time
+
+
+class TokenBucket(object):
+    '''
+    Token bucket rate limiter, `rate` tokens per second with bursts of at
+    most `burst` tokens.
+    '''
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        '''
+        Take one token, wait until one is available.
+
+        Return the seconds waited.
+        '''
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class AdaptiveLimiter(object):
+    '''
+    Client side concurrency controller shared by all parallel requests of a
+    `CQ` instance, see `CQ.set_throttle`.
+
+    At most `limit` requests are in flight, others wait in queue. The limit
+    is adjusted with AIMD: it grows by `increase` per `limit` healthy
+    completions, up to `max_limit`, and is multiplied by `decrease_factor`,
+    down to `min_limit`, when a request fails or its latency exceeds
+    `latency_tolerance` times the smoothed latency of its action, so fast and
+    slow actions are not compared against each other. Completions of
+    requests started before the last decrease are not counted again.
+
+    If `rate` is not None, requests are also limited to `rate` per second by
+    a `TokenBucket` with bursts of `burst`.
+    '''
+
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=32,
+                 increase=1, decrease_factor=0.5, latency_tolerance=2.0,
+                 rate=None, burst=None):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.bucket = TokenBucket(rate, burst) if rate is not None else None
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.increases = 0
+        self.decreases = 0
+        self.throttled = 0
+        # Exponentially weighted moving average of latencies per action,
+        # spikes included so a lasting slowdown becomes the new baseline.
+        self.latency = {}
+        self._last_decrease = time.monotonic()
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        '''
+        Wait until a request may be sent.
+
+        Return a token passed to `release` once the request completes.
+        '''
+        with self._cond:
+            if self.in_flight >= int(self.limit):
+                self.throttled += 1
+                self.queue_depth += 1
+                try:
+                    while self.in_flight >= int(self.limit):
+                        self._cond.wait()
+                finally:
+                    self.queue_depth -= 1
+            self.in_flight += 1
+        if self.bucket is not None:
+            self.bucket.acquire()
+        return time.monotonic()
+
+    def release(self, token, elapsed, error=False, action=None):
+        '''
+        Record the completion of a request of `action` acquired with `token`,
+        which took `elapsed` seconds and failed if `error` is True.
+        '''
+        with self._cond:
+            self.in_flight -= 1
+            latency = self.latency.get(action)
+            spike = latency is not None and \
+                elapsed > latency * self.latency_tolerance
+            if not error:
+                self.latency[action] = elapsed if latency is None else \
+                    latency + 0.1 * (elapsed - latency)
+            if error or spike:
+                if token >= self._last_decrease:
+                    self.limit = max(self.min_limit,
+                                     self.limit * self.decrease_factor)
+                    self.decreases += 1
+                    self._last_decrease = time.monotonic()
+            else:
+                if self.limit < self.max_limit:
+                    old = int(self.limit)
+                    self.limit = min(self.max_limit,
+                                     self.limit + self.increase / self.limit)
+                    if int(self.limit) > old:
+                        self.increases += 1
+            self._cond.notify_all()
+
+    def stats(self):
+        '''
+        Return a dict of the current limit, queue depth and counters.
+        '''
+        with self._cond:
+            return {
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'queue_depth': self.queue_depth,
+                'latency': dict(self.latency),
+                'increases': self.increases,
+                'decreases': self.decreases,
+                'throttled': self.throttled,
+            }
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+'''
+In process stand-in for a web CQ server, used by unit tests that should not
+need a real CQ server.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import json
+import threading
+
+from requests.cookies import RequestsCookieJar
+
+
+def make_field(name, value, data_type='SHORT_STRING', record_id=None):
+    field = {
+        'FieldName': name,
+        'CurrentValue': value,
+        'DataType': data_type,
+    }
+    if record_id is not None:
+        field['RecordId'] = record_id
+    return field
+
+
+def make_details(resource_id, display_name, fields=None):
+    return {
+        'STATUS': 'true',
+        'RecordId': resource_id,
+        'DisplayName': display_name,
+        'StableLocation': 'cq.repo.cq-record:%s' % resource_id,
+        'State': 'VIEW',
+        'recordType': 'record-type-%s' % resource_id,
+        'fields': fields or [],
+    }
+
+
+def make_crp_details(resource_id, display_name, customer_id='customer-1',
+                     module_id='module-1'):
+    return make_details(resource_id, display_name, [
+        make_field('ModuleName', 'module', 'RESOURCE', module_id),
+        make_field('State', 'Assigned'),
+        make_field('LastOpDate', '2017-12-04T01:56:01Z'),
+        make_field('OwnerInfo', 'Tel: 123\r\nEmail: owner@example.com'),
+        make_field('OpenDuration', '3', 'INTEGER'),
+        make_field('Customer', 'customer', 'RESOURCE', customer_id),
+        make_field('VersionBaseOn', 'v1.0'),
+        make_field('Headline', 'Headline of %s' % display_name),
+        make_field('id', display_name),
+        make_field('CustomerPhone', '456'),
+        make_field('CustomEmails', ['a@example.com'], 'MULTILINE_STRING'),
+        make_field('Unused', 'x' * 64),
+    ])
+
+
+class FakeResponse(object):
+
+    def __init__(self, jobj, status_code=200, prefix='for(;;);'):
+        self.status_code = status_code
+        self.text = prefix + json.dumps(jobj)
+        self.content = self.text.encode('utf-8')
+        self.encoding = 'utf-8'
+        self.headers = {}
+        self.history = []
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeSession(object):
+    '''
+    Mimic the part of `requests.Session` used by `CQ`.
+
+    `records` maps a display name to its details json object, resource ids
+    are the `RecordId` of each details json object. Find and details requests
+    with a cquid not logged in are answered with 401 if `check_cquid` is True,
+    or with 200 and a false status if `expired_status` is True too, call
+    `expire` to expire all sessions. `queries` maps a query id to its
+    result rows.
+    '''
+
+    def __init__(self, records=()):
+        self.records = {}
+        self.details = {}
+        for jobj in records:
+            self.add(jobj)
+        self.calls = []
+        self.closed = False
+        self.cookies = RequestsCookieJar()
+        self.valid_cquids = set()
+        self.check_cquid = False
+        self.expired_status = False
+        self.queries = {}
+        self.logins = 0
+        self._lock = threading.Lock()
+
+    def add(self, jobj):
+        self.records[jobj['DisplayName']] = jobj
+        self.details[jobj['RecordId']] = jobj
+
+    def count(self, action):
+        return len([c for c in self.calls if c == action])
+
+    def expire(self):
+        self.valid_cquids.clear()
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def request(self, method, url, params=None, data=None, **kwargs):
+        return self._handle(params or {}, data or {})
+
+    def _handle(self, params, data):
+        action = params['action']
+        with self._lock:
+            self.calls.append(action)
+        if action == 'DoLogin':
+            with self._lock:
+                self.logins += 1
+                cquid = 'cquid-%d' % self.logins
+            self.valid_cquids.add(cquid)
+            self.cookies.set('JSESSIONID', 'session-%d' % self.logins,
+                             domain='host', path='/cqweb')
+            return FakeResponse({'status': 'true', 'cqUid': cquid,
+                                 'userdb': 'db', 'fullName': 'Full Name'})
+        if action == 'DoLogout':
+            self.valid_cquids.discard(data.get('cquid'))
+            return FakeResponse({'status': 'true'})
+        if action == 'CheckAuthenticated':
+            return FakeResponse({
+                'STATUS': 'true',
+                'isAuthenticated': params.get('cquid') in self.valid_cquids})
+        if self.check_cquid and action in ('DoFindRecord',
+                                           'GetCQRecordDetails') and \
+                params.get('cquid') not in self.valid_cquids:
+            if self.expired_status:
+                return FakeResponse({'status': 'false', 'STATUS': 'false'})
+            return FakeResponse({}, status_code=401)
+        if action == 'DoGetDbSets':
+            return FakeResponse({'identifier': 'name',
+                                 'items': [{'name': 'db'}]})
+        if action == 'DoFindRecord':
+            jobj = self.records.get(params['recordId'])
+            if jobj is None:
+                return FakeResponse({'status': 'false'})
+            return FakeResponse({'status': 'true', 'id': jobj['RecordId']})
+        if action == 'GetCQRecordDetails':
+            jobj = self.details.get(params['resourceId'])
+            if jobj is None:
+                return FakeResponse({'STATUS': 'false'})
+            return FakeResponse(jobj)
+        if action == 'ExecuteQuery':
+            rows = self.queries.get(params['resourceId'])
+            if rows is None:
+                return FakeResponse({'STATUS': 'false'})
+            start = int(params['start'])
+            return FakeResponse({
+                'identifier': 'id',
+                'numRows': len(rows),
+                'items': rows[start:start + int(params['count'])],
+            })
+        return FakeResponse({}, status_code=404)
+
+
+def default_records():
+    return [
+        make_crp_details('crp-1', 'CRP00001'),
+        make_crp_details('crp-2', 'CRP00002'),
+        make_details('customer-1', 'Customer One'),
+        make_details('module-1', 'Module One'),
+    ]
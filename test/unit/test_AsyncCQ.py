@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+'''
+Test cases for class libwebcq.AsyncCQ.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import asyncio
+import unittest
+
+from libwebcq.AsyncCQ import AsyncCQ
+from libwebcq.error import CQError, NeedLoginError, SessionError
+from libwebcq.record import CRPRecord, CustomerRecord, ModuleRecord, RecordType
+from .fakecq import FakeSession, default_records
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+class AsyncCQTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cq = AsyncCQ('http://host/cqweb/', max_in_flight=4)
+        self.cq.open_session()
+        self.session = FakeSession(default_records())
+        self.cq.cq.session = self.session
+
+    def tearDown(self):
+        self.cq.close_session()
+
+    def test_without_session(self):
+        cq = AsyncCQ('http://host/cqweb/')
+        with self.assertRaises(SessionError):
+            run(cq.check_authenticated())
+
+    def test_without_login(self):
+        with self.assertRaises(NeedLoginError):
+            run(self.cq.find_record('CRP00001'))
+
+    def test_get_record_details(self):
+        async def fetch():
+            await self.cq.login('user', 'password', 'repo')
+            resource_id = await self.cq.find_record('CRP00001')
+            return await self.cq.get_cq_record_details(
+                resource_id, RecordType.CRP)
+
+        record = run(fetch())
+        self.assertTrue(self.cq.login_status)
+        self.assertIsInstance(record, CRPRecord)
+        self.assertEqual('CRP00001', record.display_name)
+        self.assertEqual(3, record.open_duration)
+        self.assertIsInstance(record.customer, CustomerRecord)
+        self.assertEqual('Customer One', record.customer.display_name)
+        self.assertIsInstance(record.module, ModuleRecord)
+        self.assertEqual('Module One', record.module.display_name)
+
+    def test_lazy_references(self):
+        self.cq.set_lazy_references(True)
+
+        async def fetch():
+            await self.cq.login('user', 'password', 'repo')
+            return await self.cq.get_record('CRP00001', RecordType.CRP)
+
+        record = run(fetch())
+        self.assertEqual(1, self.session.count('GetCQRecordDetails'))
+        # Not awaited, access fails instead of blocking the event loop.
+        with self.assertRaises(CQError):
+            record.customer
+        run(self.cq.prefetch_references([record]))
+        self.assertEqual('Customer One', record.customer.display_name)
+        self.assertEqual('Module One', record.module.display_name)
+        self.assertEqual(3, self.session.count('GetCQRecordDetails'))
+
+    def test_async_resolve_references(self):
+        self.cq.set_lazy_references(True)
+
+        async def fetch():
+            await self.cq.login('user', 'password', 'repo')
+            record = await self.cq.get_record('CRP00001', RecordType.CRP)
+            await record.async_resolve_references()
+            return record
+
+        record = run(fetch())
+        self.assertEqual('Module One', record.module.display_name)
+
+    def test_empty_resource_id(self):
+        async def fetch():
+            await self.cq.login('user', 'password', 'repo')
+            return await self.cq.get_cq_record_details('', RecordType.CRP)
+
+        self.assertIsNone(run(fetch()))
+        self.assertEqual(0, self.session.count('GetCQRecordDetails'))
+
+    def test_concurrent_find_record(self):
+        async def find_all():
+            await self.cq.login('user', 'password', 'repo')
+            return await asyncio.gather(*[
+                self.cq.find_record(record_id)
+                for record_id in ['CRP00001', 'CRP00002', 'CRP00003'] * 5])
+
+        res_ids = run(find_all())
+        self.assertEqual(['crp-1', 'crp-2', None] * 5, res_ids)
+        # Identical concurrent lookups share one request.
+        self.assertEqual(3, self.session.count('DoFindRecord'))
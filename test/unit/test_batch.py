@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+'''
+Test cases for batch methods of class libwebcq.CQ.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import unittest
+
+from libwebcq.CQ import CQ
+from libwebcq.batch import iter_batch, run_batch
+from libwebcq.error import NeedLoginError
+from libwebcq.record import RecordType
+from .fakecq import FakeSession, default_records
+
+
+class BatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cq = CQ('http://host/cqweb/')
+        self.cq.session = self.session = FakeSession(default_records())
+        self.cq.login('user', 'password', 'repo')
+
+    def test_run_batch_captures_errors(self):
+        def invert(x):
+            return 1 / x
+
+        results = list(run_batch(invert, [1, 0, 2], 2))
+        self.assertEqual([1, 0, 2], [r.key for r in results])
+        self.assertEqual([1, None, 0.5], [r.value for r in results])
+        self.assertTrue(results[0].ok)
+        self.assertIsInstance(results[1].error, ZeroDivisionError)
+
+    def test_run_batch_unordered(self):
+        results = list(run_batch(str, range(20), 4, ordered=False))
+        self.assertEqual(set(range(20)), set(r.key for r in results))
+
+    def test_iter_batch_backpressure(self):
+        taken = []
+
+        def keys():
+            for i in range(10):
+                taken.append(i)
+                yield i
+
+        results = iter_batch(lambda i: i * 2, keys(), 3)
+        self.assertEqual(0, next(results).value)
+        # The window, and one more taken after the first result.
+        self.assertEqual(4, len(taken))
+        self.assertEqual(list(range(2, 20, 2)),
+                         [result.value for result in results])
+
+    def test_iter_records(self):
+        results = list(self.cq.iter_records(
+            iter(['CRP00001', 'CRP00003', 'CRP00002']), RecordType.CRP,
+            prefetch=2))
+        self.assertEqual(['CRP00001', 'CRP00003', 'CRP00002'],
+                         [result.key for result in results])
+        self.assertEqual('Customer One', results[0].value.customer.display_name)
+        self.assertIsNone(results[1].value)
+        self.assertEqual('CRP00002', results[2].value.display_name)
+
+    def test_find_records(self):
+        results = list(self.cq.find_records(
+            ['CRP00002', 'CRP00001', 'CRP00009']))
+        self.assertEqual(['crp-2', 'crp-1', None], [r.value for r in results])
+
+    def test_get_records_details(self):
+        results = list(self.cq.get_records_details(
+            ['crp-1', 'crp-2'], RecordType.CRP))
+        self.assertEqual(['CRP00001', 'CRP00002'],
+                         [r.value.display_name for r in results])
+
+    def test_need_login(self):
+        self.cq.logout()
+        with self.assertRaises(NeedLoginError):
+            self.cq.find_records(['CRP00001'])
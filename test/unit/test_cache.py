@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+'''
+Test cases for module libwebcq.cache.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import gc
+import threading
+import time
+import unittest
+
+from libwebcq.CQ import CQ
+from libwebcq.cache import IdentityMap, LRUCache
+from libwebcq.record import CustomerRecord, RecordType
+from .fakecq import FakeSession, default_records, make_crp_details
+
+
+class LRUCacheTestCase(unittest.TestCase):
+
+    def test_max_size(self):
+        cache = LRUCache(max_size=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(1, cache.get('a'))
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(1, cache.get('a'))
+        self.assertEqual(3, cache.get('c'))
+        self.assertEqual({'hits': 3, 'misses': 1, 'evictions': 1},
+                         cache.stats())
+
+    def test_ttl(self):
+        cache = LRUCache(ttl=0.01)
+        cache.put('a', 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(0, len(cache))
+
+    def test_invalidate(self):
+        cache = LRUCache()
+        cache.put('a', 1)
+        cache.invalidate('a')
+        self.assertIsNone(cache.get('a'))
+
+
+class CQCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cq = CQ('http://host/cqweb/')
+        self.cq.session = self.session = FakeSession(default_records())
+        self.cq.login('user', 'password', 'repo')
+
+    def test_references_fetched_once(self):
+        first = self.cq.get_cq_record_details('crp-1', RecordType.CRP)
+        second = self.cq.get_cq_record_details('crp-2', RecordType.CRP)
+        self.assertIs(first.module, second.module)
+        self.assertIs(first.customer, second.customer)
+        self.assertEqual(4, self.session.count('GetCQRecordDetails'))
+
+    def test_crp_not_cached(self):
+        first = self.cq.get_cq_record_details('crp-1', RecordType.CRP)
+        for field in self.session.details['crp-1']['fields']:
+            if field['FieldName'] == 'State':
+                field['CurrentValue'] = 'Resolved'
+        second = self.cq.get_cq_record_details('crp-1', RecordType.CRP)
+        self.assertIsNot(first, second)
+        self.assertEqual('Assigned', first.state)
+        self.assertEqual('Resolved', second.state)
+        # Two CRP fetches, customer and module once.
+        self.assertEqual(4, self.session.count('GetCQRecordDetails'))
+
+    def test_cache_all_record_types(self):
+        self.cq.set_record_cache(LRUCache(record_types=None))
+        first = self.cq.get_cq_record_details('crp-1', RecordType.CRP)
+        self.assertIs(first, self.cq.get_cq_record_details(
+            'crp-1', RecordType.CRP))
+        self.assertEqual(3, self.session.count('GetCQRecordDetails'))
+
+    def test_invalidate_record(self):
+        self.cq.get_cq_record_details('module-1', RecordType.MODULE)
+        self.cq.invalidate_record('module-1')
+        self.cq.get_cq_record_details('module-1', RecordType.MODULE)
+        self.assertEqual(2, self.session.count('GetCQRecordDetails'))
+
+    def test_disable_cache(self):
+        self.cq.set_record_cache(None)
+        self.cq.get_cq_record_details('module-1', RecordType.MODULE)
+        self.cq.get_cq_record_details('module-1', RecordType.MODULE)
+        self.assertEqual(2, self.session.count('GetCQRecordDetails'))
+
+
+class IdentityMapTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cq = CQ('http://host/cqweb/')
+        self.session = FakeSession(default_records())
+        self.session.add(make_crp_details('crp-3', 'CRP00003'))
+        self.cq.session = self.session
+        self.cq.set_record_cache(None)
+        self.cq.login('user', 'password', 'repo')
+
+    def test_shared_references(self):
+        records = [self.cq.get_cq_record_details(resource_id, RecordType.CRP)
+                   for resource_id in ('crp-1', 'crp-2', 'crp-3')]
+        self.assertIs(records[0].customer, records[1].customer)
+        self.assertIs(records[0].module, records[2].module)
+        # The map does not save fetches without a record cache, three CRPs
+        # and their customer and module each.
+        self.assertEqual(9, self.session.count('GetCQRecordDetails'))
+        # CRPs are not mapped by default.
+        self.assertIsNot(records[0], self.cq.get_cq_record_details(
+            'crp-1', RecordType.CRP))
+
+    def test_ttl(self):
+        self.cq.set_record_cache(LRUCache(ttl=0.01))
+        customer = self.cq.get_cq_record_details('customer-1',
+                                                 RecordType.CUSTOMER)
+        self.session.details['customer-1']['DisplayName'] = 'Renamed'
+        self.assertIs(customer, self.cq.get_cq_record_details(
+            'customer-1', RecordType.CUSTOMER))
+        self.assertEqual(1, self.session.count('GetCQRecordDetails'))
+        time.sleep(0.02)
+        # Expired in cache, fetched again and the shared instance updated.
+        self.assertIs(customer, self.cq.get_cq_record_details(
+            'customer-1', RecordType.CUSTOMER))
+        self.assertEqual(2, self.session.count('GetCQRecordDetails'))
+        self.assertEqual('Renamed', customer.display_name)
+
+    def test_concurrent_updates(self):
+        identity_map = IdentityMap()
+        key = ('customer-1', RecordType.CUSTOMER)
+        shared = CustomerRecord()
+        identity_map.put(key, shared)
+
+        def refresh(name):
+            for _ in range(200):
+                record = CustomerRecord()
+                record.record_id = record.display_name = name
+                identity_map.put(key, record)
+
+        threads = [threading.Thread(target=refresh, args=(name,))
+                   for name in ('a', 'b', 'c')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertIs(shared, identity_map.get(key))
+        self.assertEqual(shared.record_id, shared.display_name)
+
+    def test_weak_references(self):
+        identity_map = self.cq.identity_map
+        record = self.cq.get_cq_record_details('crp-1', RecordType.CRP)
+        self.assertEqual(2, len(identity_map))
+        del record
+        gc.collect()
+        self.assertEqual(0, len(identity_map))
+
+    def test_invalidate_record(self):
+        customer = self.cq.get_cq_record_details('customer-1',
+                                                 RecordType.CUSTOMER)
+        self.cq.invalidate_record('customer-1')
+        self.assertIsNot(customer, self.cq.get_cq_record_details(
+            'customer-1', RecordType.CUSTOMER))
+
+    def test_scope(self):
+        self.cq.set_identity_map(IdentityMap([RecordType.CRP]))
+        record = self.cq.get_cq_record_details('crp-1', RecordType.CRP)
+        self.assertIs(record, self.cq.get_cq_record_details(
+            'crp-1', RecordType.CRP))
+        self.cq.set_identity_map(None)
+        self.assertIsNot(record, self.cq.get_cq_record_details(
+            'crp-1', RecordType.CRP))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+'''
+Test cases for module libwebcq.decode.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import unittest
+
+from libwebcq.decode import DecodeMode, JSONDecoder
+
+
+class JSONDecoderTestCase(unittest.TestCase):
+
+    def test_prefixed_json(self):
+        decoder = JSONDecoder()
+        jobj = decoder.decode(b'for(;;);{"STATUS": "true", "a": [1, 2]}')
+        self.assertEqual({'STATUS': 'true', 'a': [1, 2]}, jobj)
+        self.assertEqual({'fast': 1, 'fallback': 0}, decoder.stats())
+
+    def test_plain_json(self):
+        decoder = JSONDecoder()
+        self.assertEqual({'a': 1}, decoder.decode(b'{"a": 1}'))
+
+    def test_non_strict_json_fallback(self):
+        decoder = JSONDecoder()
+        jobj = decoder.decode(b"for(;;);{STATUS: 'true'}")
+        self.assertEqual({'STATUS': 'true'}, jobj)
+        self.assertEqual({'fast': 0, 'fallback': 1}, decoder.stats())
+
+    def test_strict_mode(self):
+        decoder = JSONDecoder(DecodeMode.STRICT)
+        with self.assertRaises(ValueError):
+            decoder.decode(b"for(;;);{STATUS: 'true'}")
+
+    def test_demjson_mode(self):
+        decoder = JSONDecoder(DecodeMode.DEMJSON)
+        self.assertEqual({'a': 1}, decoder.decode(b'{"a": 1}'))
+        self.assertEqual({'fast': 0, 'fallback': 1}, decoder.stats())
+
+    def test_encoding(self):
+        decoder = JSONDecoder()
+        content = 'for(;;);{"name": "中文"}'.encode('gbk')
+        self.assertEqual({'name': '中文'},
+                         decoder.decode(content, 'gbk'))
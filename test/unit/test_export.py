@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+'''
+Test cases for module libwebcq.export.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from libwebcq import export
+from libwebcq.CQ import CQ
+from libwebcq.export import export_records, flatten
+from libwebcq.record import RecordType
+from .fakecq import FakeSession, default_records, make_crp_details
+
+
+class ExportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cq = CQ('http://host/cqweb/')
+        self.session = FakeSession(default_records())
+        for i in range(3, 11):
+            self.session.add(make_crp_details('crp-%d' % i, 'CRP%05d' % i))
+        self.cq.session = self.session
+        self.cq.login('user', 'password', 'repo')
+        self.record_ids = ['CRP%05d' % i for i in range(1, 11)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_flatten(self):
+        record = self.cq.get_record('CRP00001', RecordType.CRP)
+        row = flatten(record)
+        self.assertEqual('CRP00001', row['display_name'])
+        self.assertEqual('CRP', row['record_type'])
+        self.assertEqual('123', row['owner_info_tel'])
+        self.assertEqual('owner@example.com', row['owner_info_email'])
+        self.assertEqual('Customer One', row['customer'])
+        self.assertEqual('Module One', row['module'])
+        self.assertEqual('a@example.com', row['custom_emails'])
+
+    def test_jsonl(self):
+        path = os.path.join(self.tmpdir, 'records.jsonl')
+        result = export_records(self.cq, self.record_ids + ['CRP99999'],
+                                path, chunk_size=3)
+        self.assertEqual(10, result.exported)
+        self.assertEqual(['CRP99999'], [r.key for r in result.failed])
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(self.record_ids,
+                         [row['display_name'] for row in rows])
+        self.assertFalse(os.path.exists(path + '.progress'))
+
+    def test_csv(self):
+        path = os.path.join(self.tmpdir, 'records.csv')
+        export_records(self.cq, self.record_ids, path, chunk_size=4)
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(self.record_ids,
+                         [row['display_name'] for row in rows])
+        self.assertEqual('3', rows[0]['open_duration'])
+
+    def test_csv_columns(self):
+        fields = self.session.details['crp-1']['fields']
+        fields[:] = [f for f in fields if f['FieldName'] != 'Customer']
+        path = os.path.join(self.tmpdir, 'records.csv')
+        export_records(self.cq, self.record_ids, path, chunk_size=4)
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual('', rows[0]['customer'])
+        self.assertEqual('Customer One', rows[1]['customer'])
+        self.assertEqual('Module One', rows[1]['module'])
+
+    def test_csv_resume_header(self):
+        path = os.path.join(self.tmpdir, 'records.csv')
+        with open(path, 'w', newline='') as f:
+            f.write('display_name,headline\r\nCRP00001,First\r\n')
+            position = f.tell()
+        writer = export.CSVWriter(path, ('headline', 'display_name', 'id'),
+                                  position)
+        writer.write([{'headline': 'Second', 'display_name': 'CRP00002',
+                       'id': 'CRP00002'}])
+        writer.close()
+        with open(path, newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual([['display_name', 'headline'],
+                          ['CRP00001', 'First'], ['CRP00002', 'Second']],
+                         rows)
+
+    def test_resume(self):
+        path = os.path.join(self.tmpdir, 'records.csv')
+        get_record = self.cq.get_record
+
+        def interrupted(record_id, record_type, *args):
+            if record_id == 'CRP00005':
+                raise KeyboardInterrupt()
+            return get_record(record_id, record_type, *args)
+
+        self.cq.get_record = interrupted
+        with self.assertRaises(KeyboardInterrupt):
+            export_records(self.cq, self.record_ids, path, chunk_size=2,
+                           max_workers=1)
+        self.assertTrue(os.path.exists(path + '.progress'))
+
+        self.cq.get_record = get_record
+        result = export_records(self.cq, self.record_ids, path, chunk_size=2)
+        self.assertEqual((6, 4), result[:2])
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(self.record_ids,
+                         [row['display_name'] for row in rows])
+
+    def test_resume_without_output(self):
+        get_record = self.cq.get_record
+
+        def interrupted(record_id, record_type, *args):
+            if record_id == 'CRP00005':
+                raise KeyboardInterrupt()
+            return get_record(record_id, record_type, *args)
+
+        for name in ('records.jsonl', 'records.csv'):
+            path = os.path.join(self.tmpdir, name)
+            self.cq.get_record = interrupted
+            with self.assertRaises(KeyboardInterrupt):
+                export_records(self.cq, self.record_ids, path, chunk_size=2,
+                               max_workers=1)
+            self.cq.get_record = get_record
+            if name.endswith('.csv'):
+                with open(path, 'r+b') as f:
+                    f.truncate(10)
+            else:
+                os.remove(path)
+            result = export_records(self.cq, self.record_ids, path,
+                                    chunk_size=2)
+            self.assertEqual((10, 0), result[:2])
+            with open(path, 'rb') as f:
+                content = f.read()
+            self.assertNotIn(b'\0', content)
+            self.assertEqual(len(self.record_ids) + name.endswith('.csv'),
+                             len(content.splitlines()))
+
+    @unittest.skipIf(export.pyarrow is None, 'pyarrow is not installed.')
+    def test_parquet(self):
+        path = os.path.join(self.tmpdir, 'records.parquet')
+        export_records(self.cq, self.record_ids, path, chunk_size=4)
+        table = export.pyarrow.parquet.read_table(path)
+        self.assertEqual(self.record_ids,
+                         table.column('display_name').to_pylist())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+'''
+Regression test cases for import time of libwebcq, heavy modules should not
+be imported until first use.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+import libwebcq
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+def imported_modules(code):
+    '''
+    Run `code` in a fresh interpreter, return names of imported modules.
+    '''
+    code += '\nimport json, sys\nprint(json.dumps(sorted(sys.modules)))'
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=ROOT)
+    return set(json.loads(output.decode('utf-8')))
+
+
+class ImportTestCase(unittest.TestCase):
+
+    def test_import_package(self):
+        modules = imported_modules('import libwebcq')
+        self.assertEqual(['libwebcq'],
+                         [m for m in modules if m.startswith('libwebcq')])
+
+    def test_import_cq(self):
+        modules = imported_modules('import libwebcq.CQ')
+        for name in ('requests', 'demjson', 'asyncio'):
+            self.assertNotIn(name, modules)
+
+    def test_open_session(self):
+        modules = imported_modules(
+            'from libwebcq.CQ import CQ\nCQ("http://host/").open_session()')
+        self.assertIn('requests', modules)
+        self.assertNotIn('demjson', modules)
+
+    def test_lazy_exports(self):
+        for name in libwebcq.__all__:
+            self.assertIsNotNone(getattr(libwebcq, name))
+        with self.assertRaises(AttributeError):
+            libwebcq.NoSuchName
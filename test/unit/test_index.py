@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+'''
+Test cases for module libwebcq.index and CQ.get_record.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from libwebcq.CQ import CQ
+from libwebcq.index import RecordIndex
+from libwebcq.record import RecordType
+from .fakecq import FakeSession, default_records
+
+
+class RecordIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'index.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_persistent(self):
+        index = RecordIndex(self.path)
+        index.update({'CRP00001': 'crp-1', 'CRP00002': 'crp-2'})
+        index.close()
+        index = RecordIndex(self.path)
+        self.assertEqual(2, len(index))
+        self.assertEqual('crp-1', index.get('CRP00001'))
+        self.assertIsNone(index.get('CRP00003'))
+        self.assertEqual({'hits': 1, 'misses': 1}, index.stats())
+        index.close()
+
+    def test_max_age(self):
+        index = RecordIndex(max_age=0.01)
+        index.put('CRP00001', 'crp-1')
+        time.sleep(0.02)
+        self.assertIsNone(index.get('CRP00001'))
+
+
+class GetRecordTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cq = CQ('http://host/cqweb/')
+        self.session = FakeSession(default_records())
+        self.cq.session = self.session
+        self.cq.set_record_cache(None)
+        self.cq.login('user', 'password', 'repo')
+
+    def test_get_record(self):
+        record = self.cq.get_record('CRP00001', RecordType.CRP)
+        self.assertEqual('crp-1', record.record_id)
+        self.assertEqual(1, self.session.count('DoFindRecord'))
+        record = self.cq.get_record('CRP00001', RecordType.CRP)
+        self.assertEqual('CRP00001', record.display_name)
+        self.assertEqual(1, self.session.count('DoFindRecord'))
+        self.assertIsNone(self.cq.get_record('CRP00003', RecordType.CRP))
+
+    def test_filled_by_details(self):
+        self.cq.get_cq_record_details('crp-2', RecordType.CRP)
+        self.assertEqual('crp-2', self.cq.record_index.get('CRP00002'))
+        self.cq.get_record('CRP00002', RecordType.CRP)
+        self.assertEqual(0, self.session.count('DoFindRecord'))
+
+    def test_stale_entry(self):
+        self.cq.record_index.put('CRP00001', 'crp-2')
+        record = self.cq.get_record('CRP00001', RecordType.CRP)
+        self.assertEqual('crp-1', record.record_id)
+        self.assertEqual(1, self.session.count('DoFindRecord'))
+        self.assertEqual('crp-1', self.cq.record_index.get('CRP00001'))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+'''
+Test cases for module libwebcq.instrument.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import io
+import json
+import unittest
+
+from libwebcq import instrument
+from libwebcq.CQ import CQ
+from libwebcq.instrument import Histogram, MetricsCollector
+from libwebcq.record import RecordType
+from .fakecq import FakeSession, default_records
+
+
+class HistogramTestCase(unittest.TestCase):
+
+    def test_add(self):
+        hist = Histogram()
+        for value in (0.001, 0.002, 0.02, 20):
+            hist.add(value)
+        self.assertEqual(4, hist.count)
+        self.assertEqual(0.001, hist.min)
+        self.assertEqual(20, hist.max)
+        self.assertEqual(0.005, hist.quantile(0.5))
+        self.assertIsNone(hist.quantile(1))
+
+
+class InstrumentTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cq = CQ('http://host/cqweb/')
+        self.cq.session = FakeSession(default_records())
+
+    def test_hooks(self):
+        events = []
+        for event in instrument.EVENTS:
+            self.cq.add_hook(event, lambda info, e=event: events.append(
+                (e, info['action'])))
+        self.cq.login('user', 'password', 'repo')
+        self.cq.get_cq_record_details('module-1', RecordType.MODULE)
+        self.assertEqual([
+            ('before_request', 'DoLogin'),
+            ('after_request', 'DoLogin'),
+            ('after_decode', 'DoLogin'),
+            ('before_request', 'GetCQRecordDetails'),
+            ('after_request', 'GetCQRecordDetails'),
+            ('after_decode', 'GetCQRecordDetails'),
+            ('after_parse', 'GetCQRecordDetails'),
+        ], events)
+
+    def test_hook_added_while_decoding(self):
+        decoder = self.cq.decoder
+        events = []
+        cq = self.cq
+
+        class Decoder(object):
+
+            def decode(self, content, encoding):
+                if not cq.hooks:
+                    cq.add_hook(instrument.AFTER_DECODE,
+                                lambda info: events.append(info['action']))
+                return decoder.decode(content, encoding)
+
+        self.cq.decoder = Decoder()
+        self.cq.login('user', 'password', 'repo')
+        self.cq.find_record('CRP00001')
+        self.assertEqual(['DoFindRecord'], events)
+
+    def test_no_hooks(self):
+        self.assertFalse(self.cq.hooks)
+        events = []
+        self.cq.add_hook(instrument.AFTER_REQUEST, events.append)
+        self.assertTrue(self.cq.hooks)
+        self.cq.remove_hook(instrument.AFTER_REQUEST, events.append)
+        self.assertFalse(self.cq.hooks)
+
+    def test_collector(self):
+        collector = MetricsCollector()
+        collector.install(self.cq)
+        self.cq.login('user', 'password', 'repo')
+        self.cq.get_cq_record_details('crp-1', RecordType.CRP)
+        snapshot = json.loads(json.dumps(collector.snapshot()))
+        details = snapshot['actions']['GetCQRecordDetails']
+        self.assertEqual(3, details['latency']['count'])
+        self.assertEqual(3, details['decode']['count'])
+        self.assertEqual({'200': 3}, details['statuses'])
+        self.assertTrue(details['bytes'] > 0)
+        self.assertEqual(1, snapshot['parse']['CRP']['count'])
+        self.assertEqual(2, snapshot['parse']['MODULE']['count']
+                         + snapshot['parse']['CUSTOMER']['count'])
+        output = io.StringIO()
+        collector.dump(output)
+        self.assertIn('GetCQRecordDetails', output.getvalue())
+        collector.uninstall(self.cq)
+        self.assertFalse(self.cq.hooks)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+'''
+Test cases for module libwebcq.parallel and pickling records.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import os
+import pickle
+import unittest
+
+from libwebcq.CQ import CQ
+from libwebcq.parallel import ShardedFetcher
+from libwebcq.record import RecordType
+from .fakecq import FakeSession, default_records, make_crp_details
+
+
+def use_fake_session(cq):
+    session = FakeSession(default_records())
+    for i in range(3, 21):
+        session.add(make_crp_details('crp-%d' % i, 'CRP%05d' % i))
+    cq.session = session
+
+
+def make_record_ids():
+    return ['CRP%05d' % i for i in range(1, 22)]
+
+
+class PickleRecordTestCase(unittest.TestCase):
+
+    def test_pickle(self):
+        cq = CQ('http://host/cqweb/')
+        use_fake_session(cq)
+        cq.login('user', 'password', 'repo')
+        record = cq.get_record('CRP00001', RecordType.CRP)
+        data = pickle.dumps(record)
+        self.assertNotIn(b'FakeSession', data)
+
+        copy = pickle.loads(data)
+        self.assertIsNone(copy.cq_ref)
+        self.assertEqual(record.values(), copy.values())
+        self.assertEqual(record.fingerprint, copy.fingerprint)
+        self.assertEqual('Customer One', copy.customer.display_name)
+        self.assertEqual('123', copy.owner_info.tel)
+
+    def test_pickle_unresolved(self):
+        cq = CQ('http://host/cqweb/')
+        use_fake_session(cq)
+        cq.login('user', 'password', 'repo')
+        cq.set_lazy_references(True)
+        record = cq.get_record('CRP00001', RecordType.CRP)
+        copy = pickle.loads(pickle.dumps(record))
+        # Detached, the reference can not be fetched.
+        self.assertIsNone(copy.customer)
+        self.assertEqual({'customer', 'module'}, set(copy.references))
+
+
+class ShardedFetcherTestCase(unittest.TestCase):
+
+    def test_iter_records(self):
+        with ShardedFetcher('http://host/cqweb/', 'user', 'password', 'repo',
+                            processes=2, shard_size=4,
+                            configure=use_fake_session) as fetcher:
+            results = list(fetcher.iter_records(
+                iter(make_record_ids()), RecordType.CRP))
+        record_ids = make_record_ids()
+        self.assertEqual(record_ids, [result.key for result in results])
+        self.assertEqual(record_ids[:-1],
+                         [r.value.display_name for r in results[:-1]])
+        self.assertIsNone(results[-1].value)
+        self.assertEqual('Module One', results[0].value.module.display_name)
+        # Shared across shards.
+        self.assertIs(results[0].value.module, results[-2].value.module)
+
+    def test_login_failed(self):
+        with ShardedFetcher('http://host/cqweb/', 'user', 'password', 'repo',
+                            processes=1) as fetcher:
+            results = list(fetcher.iter_records(['CRP00001'], RecordType.CRP))
+        self.assertEqual(1, len(results))
+        self.assertFalse(results[0].ok)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+'''
+Test cases for paginated queries of libwebcq.CQ.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import unittest
+
+from libwebcq.CQ import CQ
+from libwebcq.error import CQError
+from libwebcq.record import RecordType
+from .fakecq import FakeSession, default_records
+
+
+class QueryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cq = CQ('http://host/cqweb/')
+        self.session = FakeSession(default_records())
+        self.session.queries['query-1'] = [
+            {'id': 'crp-%d' % (i % 2 + 1), 'Headline': 'row %d' % i}
+            for i in range(25)]
+        self.cq.session = self.session
+        self.cq.login('user', 'password', 'repo')
+
+    def test_execute_query(self):
+        for prefetch in (True, False):
+            rows = list(self.cq.execute_query('query-1', page_size=10,
+                                              prefetch=prefetch))
+            self.assertEqual(['row %d' % i for i in range(25)],
+                             [row['Headline'] for row in rows])
+        self.assertEqual(6, self.session.count('ExecuteQuery'))
+
+    def test_full_last_page(self):
+        rows = list(self.cq.execute_query('query-1', page_size=5))
+        self.assertEqual(25, len(rows))
+        # Stop by the total row count, no empty page is requested.
+        self.assertEqual(5, self.session.count('ExecuteQuery'))
+
+    def test_close_early(self):
+        rows = self.cq.execute_query('query-1', page_size=10)
+        self.assertEqual('row 0', next(rows)['Headline'])
+        rows.close()
+        # The prefetched second page is cancelled unless started already.
+        self.assertLessEqual(self.session.count('ExecuteQuery'), 2)
+
+    def test_failed_query(self):
+        with self.assertRaises(CQError):
+            list(self.cq.execute_query('query-2'))
+
+    def test_query_records(self):
+        self.cq.set_query_page_size(4)
+        results = list(self.cq.query_records('query-1', RecordType.CRP))
+        self.assertEqual(['CRP0000%d' % (i % 2 + 1) for i in range(25)],
+                         [result.value.display_name for result in results])
+
+    def test_query_protocol(self):
+        with self.assertRaises(ValueError):
+            self.cq.set_query_protocol(unknown='x')
+        self.cq.set_query_protocol(action='RunQuery')
+        self.assertEqual('ExecuteQuery', CQ.query_protocol['action'])
+        with self.assertRaises(CQError):
+            list(self.cq.execute_query('query-1'))
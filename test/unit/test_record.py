@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+'''
+Test cases for module libwebcq.record.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import unittest
+
+from libwebcq.CQ import CQ
+from libwebcq.record import CRPRecord, ModuleRecord, RecordType
+from .fakecq import FakeSession, default_records, make_crp_details
+
+
+class RecordTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cq = CQ('http://host/cqweb/')
+        self.cq.session = self.session = FakeSession(default_records())
+        self.cq.login('user', 'password', 'repo')
+
+    def test_parse_crp(self):
+        record = CRPRecord.create_from_json_resp(
+            self.cq, make_crp_details('crp-1', 'CRP00001'), RecordType.CRP)
+        self.assertEqual('CRP00001', record.display_name)
+        self.assertEqual('Assigned', record.state)
+        self.assertEqual(3, record.open_duration)
+        self.assertEqual('123', record.owner_info.tel)
+        self.assertEqual('owner@example.com', record.owner_info.email)
+        self.assertEqual(['a@example.com'], record.custom_emails)
+        self.assertEqual('Module One', record.module.display_name)
+        self.assertEqual('Customer One', record.customer.display_name)
+
+    def test_lazy_references(self):
+        self.cq.set_lazy_references(True)
+        record = self.cq.get_cq_record_details('crp-1', RecordType.CRP)
+        self.assertEqual(1, self.session.count('GetCQRecordDetails'))
+        self.assertEqual(2, len(record.unresolved_references()))
+        self.assertIsInstance(record.module, ModuleRecord)
+        self.assertEqual(2, self.session.count('GetCQRecordDetails'))
+        self.assertEqual([('customer', 'customer-1', RecordType.CUSTOMER)],
+                         record.unresolved_references())
+
+    def test_prefetch_references(self):
+        self.cq.set_lazy_references(True)
+        records = [r.value for r in self.cq.get_records_details(
+            ['crp-1', 'crp-2'], RecordType.CRP)]
+        self.cq.prefetch_references(records)
+        self.assertEqual(4, self.session.count('GetCQRecordDetails'))
+        for record in records:
+            self.assertEqual([], record.unresolved_references())
+            self.assertEqual('Customer One', record.customer.display_name)
+        self.assertEqual(4, self.session.count('GetCQRecordDetails'))
+
+    def test_field_projection(self):
+        record = self.cq.get_cq_record_details(
+            'crp-1', RecordType.CRP, fields=['Headline', 'State'],
+            all_tabs=False)
+        self.assertEqual('Headline of CRP00001', record.headline)
+        self.assertEqual('Assigned', record.state)
+        self.assertIsNone(record.owner_info)
+        self.assertIsNone(record.module)
+        self.assertEqual(1, self.session.count('GetCQRecordDetails'))
+        # Projected records are not cached.
+        record = self.cq.get_cq_record_details('crp-1', RecordType.CRP)
+        self.assertEqual('123', record.owner_info.tel)
+
+    def test_slots(self):
+        record = self.cq.get_cq_record_details('crp-1', RecordType.CRP)
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertFalse(hasattr(record.owner_info, '__dict__'))
+        self.assertFalse(hasattr(record.module, '__dict__'))
+
+    def test_values(self):
+        record = self.cq.get_cq_record_details('crp-1', RecordType.CRP)
+        values = record.values()
+        self.assertEqual('Assigned', values['state'])
+        self.assertEqual('module-1', values['module'])
+        self.assertEqual('customer-1', values['customer'])
+        self.assertNotIn('cq_ref', values)
+        self.assertNotIn('_module', values)
+
+    def test_fingerprint_and_diff(self):
+        jobj = make_crp_details('crp-1', 'CRP00001')
+        record = CRPRecord.create_from_json_resp(
+            self.cq, jobj, RecordType.CRP, True)
+        same = CRPRecord.create_from_json_resp(
+            self.cq, make_crp_details('crp-1', 'CRP00001'), RecordType.CRP,
+            True)
+        self.assertEqual(40, len(record.fingerprint))
+        self.assertEqual(record.fingerprint, same.fingerprint)
+        self.assertEqual({}, record.diff(same))
+
+        jobj['fields'][1]['CurrentValue'] = 'Resolved'
+        changed = CRPRecord.create_from_json_resp(
+            self.cq, jobj, RecordType.CRP, True)
+        self.assertNotEqual(record.fingerprint, changed.fingerprint)
+        self.assertEqual({'state': ('Resolved', 'Assigned')},
+                         changed.diff(record))
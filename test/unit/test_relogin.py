@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+'''
+Test cases for re-login of libwebcq.CQ after the session expired.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import unittest
+
+from libwebcq.CQ import CQ
+from libwebcq.error import SessionExpiredError
+from libwebcq.record import RecordType
+from .fakecq import FakeSession, default_records
+
+
+class ReloginTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cq = CQ('http://host/cqweb/')
+        self.session = FakeSession(default_records())
+        self.session.check_cquid = True
+        self.cq.session = self.session
+
+    def test_relogin(self):
+        self.cq.login('user', 'password', 'repo')
+        self.assertEqual('crp-1', self.cq.find_record('CRP00001'))
+        self.session.expire()
+        self.assertEqual('crp-2', self.cq.find_record('CRP00002'))
+        self.assertEqual('cquid-2', self.cq.cquid)
+        self.assertEqual(1, self.cq.relogins)
+        self.assertEqual(2, self.session.count('DoLogin'))
+        self.assertEqual(3, self.session.count('DoFindRecord'))
+
+    def test_relogin_on_false_status(self):
+        self.session.expired_status = True
+        self.cq.login('user', 'password', 'repo')
+        self.session.expire()
+        record = self.cq.get_cq_record_details('customer-1',
+                                               RecordType.CUSTOMER)
+        self.assertEqual('Customer One', record.display_name)
+        self.assertEqual(1, self.cq.relogins)
+        self.assertEqual('crp-2', self.cq.find_record('CRP00002'))
+        # Not found with a live session is not taken for an expiry.
+        self.assertIsNone(self.cq.find_record('CRP99999'))
+        self.assertEqual(1, self.cq.relogins)
+        self.assertEqual(2, self.session.count('CheckAuthenticated'))
+
+    def test_concurrent_relogin(self):
+        self.cq.set_single_flight(False)
+        self.cq.login('user', 'password', 'repo')
+        self.session.expire()
+        record_ids = ['CRP00001', 'CRP00002'] * 20
+        results = list(self.cq.find_records(record_ids, max_workers=8))
+        self.assertEqual(['crp-1', 'crp-2'] * 20,
+                         [result.value for result in results])
+        # Requests failed with the same expired session login once.
+        self.assertEqual(1, self.cq.relogins)
+        self.assertEqual(2, self.session.count('DoLogin'))
+
+    def test_without_credentials(self):
+        self.cq.set_auto_relogin(False)
+        self.cq.login('user', 'password', 'repo')
+        self.session.expire()
+        with self.assertRaises(SessionExpiredError):
+            self.cq.find_record('CRP00001')
+        self.assertFalse(self.cq.login_status)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+'''
+Test cases for module libwebcq.retry and retrying requests of libwebcq.CQ.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import unittest
+
+import requests
+
+from libwebcq.CQ import CQ
+from libwebcq.record import RecordType
+from libwebcq.retry import RetryPolicy
+from .fakecq import FakeResponse, FakeSession, default_records
+
+
+class FlakySession(FakeSession):
+    '''
+    Fail the first `failures` requests of `DoFindRecord`.
+    '''
+
+    def __init__(self, failures, error=None):
+        super(FlakySession, self).__init__(default_records())
+        self.failures = failures
+        self.error = error
+        self.kwargs = []
+
+    def request(self, method, url, params=None, data=None, **kwargs):
+        self.kwargs.append(kwargs)
+        action = params['action']
+        if action == 'DoFindRecord' and self.count(action) < self.failures:
+            self.calls.append(action)
+            if self.error is not None:
+                raise self.error
+            return FakeResponse({}, status_code=503)
+        return super(FlakySession, self).request(
+            method, url, params, data, **kwargs)
+
+
+class RetryPolicyTestCase(unittest.TestCase):
+
+    def test_should_retry(self):
+        policy = RetryPolicy(max_retries=2)
+        self.assertTrue(policy.should_retry('DoFindRecord', 0, 503))
+        self.assertTrue(policy.should_retry('DoFindRecord', 1))
+        self.assertFalse(policy.should_retry('DoFindRecord', 2, 503))
+        self.assertFalse(policy.should_retry('DoFindRecord', 0, 404))
+        self.assertFalse(policy.should_retry('DoLogin', 0, 503))
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5)
+        for attempt in range(6):
+            delay = policy.backoff(attempt)
+            self.assertTrue(0 <= delay <= min(5, 2 ** attempt))
+        policy.jitter = False
+        self.assertEqual(4, policy.backoff(2))
+        self.assertEqual(5, policy.backoff(3))
+
+
+class CQRetryTestCase(unittest.TestCase):
+
+    def make_cq(self, session):
+        cq = CQ('http://host/cqweb/')
+        cq.set_retry_policy(RetryPolicy(backoff_factor=0))
+        cq.session = session
+        cq.login('user', 'password', 'repo')
+        return cq
+
+    def test_retry_status(self):
+        session = FlakySession(2)
+        cq = self.make_cq(session)
+        self.assertEqual('crp-1', cq.find_record('CRP00001'))
+        self.assertEqual(3, session.count('DoFindRecord'))
+
+    def test_retry_connection_error(self):
+        session = FlakySession(2, requests.ConnectionError())
+        cq = self.make_cq(session)
+        self.assertEqual('crp-1', cq.find_record('CRP00001'))
+
+    def test_give_up(self):
+        session = FlakySession(10, requests.ConnectionError())
+        cq = self.make_cq(session)
+        with self.assertRaises(requests.ConnectionError):
+            cq.find_record('CRP00001')
+        self.assertEqual(4, session.count('DoFindRecord'))
+
+    def test_timeout(self):
+        session = FlakySession(0)
+        cq = self.make_cq(session)
+        cq.set_timeout(5)
+        cq.set_timeout(30, 'GetCQRecordDetails')
+        cq.find_record('CRP00001')
+        cq.get_cq_record_details('module-1', RecordType.MODULE)
+        self.assertEqual([None, 5, 30],
+                         [kw['timeout'] for kw in session.kwargs])
+
+    def test_reopen_session(self):
+        cq = CQ('http://host/cqweb/')
+        cq.open_session()
+        cq.close_session()
+        self.assertIsNone(cq.session)
+        cq.open_session()
+        self.assertIsNotNone(cq.session)
+        cq.close_session()
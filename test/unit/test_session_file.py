@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+'''
+Test cases for saving and restoring sessions of libwebcq.CQ.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import json
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from libwebcq.CQ import CQ
+from .fakecq import FakeSession
+
+
+class SessionFileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'session.json')
+        self.server = FakeSession()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def make_cq(self):
+        cq = CQ('http://host/cqweb/')
+        # A new client of the same server, the server state is shared.
+        cq.session = FakeSession()
+        cq.session.calls = self.server.calls
+        cq.session.valid_cquids = self.server.valid_cquids
+        cq.set_session_file(self.path)
+        return cq
+
+    def test_reuse_session(self):
+        cq = self.make_cq()
+        self.assertTrue(cq.login('user', 'password', 'repo'))
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+
+        cq = self.make_cq()
+        self.assertTrue(cq.login('user', 'password', 'repo'))
+        self.assertTrue(cq.login_status)
+        self.assertEqual('cquid-1', cq.cquid)
+        self.assertEqual('Full Name', cq.full_name)
+        self.assertEqual('session-1', cq.session.cookies['JSESSIONID'])
+        self.assertEqual(1, self.server.count('DoLogin'))
+
+    def test_expired_session(self):
+        cq = self.make_cq()
+        cq.login('user', 'password', 'repo')
+        self.server.valid_cquids.clear()
+
+        cq = self.make_cq()
+        self.assertTrue(cq.login('user', 'password', 'repo'))
+        self.assertEqual(2, self.server.count('DoLogin'))
+
+    def test_expired_session_keeps_cookies(self):
+        cq = self.make_cq()
+        cq.login('user', 'password', 'repo')
+        self.server.valid_cquids.clear()
+
+        cq = self.make_cq()
+        cq.session.cookies.set('JSESSIONID', 'fresh')
+        self.assertFalse(cq.restore_session(self.path))
+        self.assertEqual('fresh', cq.session.cookies['JSESSIONID'])
+
+    def test_malformed_session_file(self):
+        with open(self.path, 'w') as f:
+            json.dump({'url': 'http://host/cqweb/'}, f)
+        cq = self.make_cq()
+        self.assertFalse(cq.restore_session(self.path))
+        self.assertTrue(cq.login('user', 'password', 'repo'))
+        self.assertEqual(1, self.server.count('DoLogin'))
+
+    def test_other_user(self):
+        cq = self.make_cq()
+        cq.login('user', 'password', 'repo')
+        cq = self.make_cq()
+        cq.login('other', 'password', 'repo')
+        self.assertEqual(2, self.server.count('DoLogin'))
+
+    def test_logout(self):
+        cq = self.make_cq()
+        cq.login('user', 'password', 'repo')
+        cq.logout()
+        self.assertFalse(os.path.exists(self.path))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+'''
+Test cases for module libwebcq.singleflight.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import asyncio
+import threading
+import time
+import unittest
+
+from libwebcq.AsyncCQ import AsyncCQ
+from libwebcq.CQ import CQ
+from libwebcq.record import RecordType
+from libwebcq.singleflight import SingleFlight
+from .fakecq import FakeSession, default_records
+
+
+class SlowSession(FakeSession):
+
+    def request(self, method, url, params=None, data=None, **kwargs):
+        time.sleep(0.05)
+        return super(SlowSession, self).request(
+            method, url, params, data, **kwargs)
+
+
+class SingleFlightTestCase(unittest.TestCase):
+
+    def run_threads(self, target, count=8):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_share_result(self):
+        flight = SingleFlight()
+        results = []
+
+        def slow():
+            time.sleep(0.05)
+            return object()
+
+        self.run_threads(lambda: results.append(flight.do('key', slow)))
+        self.assertEqual(8, len(results))
+        self.assertEqual(1, len(set(id(r) for r in results)))
+        self.assertEqual({'calls': 1, 'shared': 7}, flight.stats())
+
+    def test_share_error(self):
+        flight = SingleFlight()
+        errors = []
+
+        def fail():
+            time.sleep(0.05)
+            raise KeyError('x')
+
+        def call():
+            try:
+                flight.do('key', fail)
+            except KeyError as err:
+                errors.append(err)
+
+        self.run_threads(call)
+        self.assertEqual(8, len(errors))
+        self.assertEqual(1, flight.calls)
+
+    def test_cq(self):
+        cq = CQ('http://host/cqweb/')
+        cq.session = session = SlowSession(default_records())
+        cq.set_record_cache(None)
+        cq.login('user', 'password', 'repo')
+        results = list(cq.get_records_details(
+            ['crp-1', 'crp-1', 'crp-2', 'crp-2'], RecordType.CRP))
+        self.assertIs(results[0].value, results[1].value)
+        # crp-1, crp-2 and the shared customer and module.
+        self.assertEqual(4, session.count('GetCQRecordDetails'))
+
+    def test_async_cq(self):
+        cq = AsyncCQ('http://host/cqweb/')
+        cq.open_session()
+        cq.cq.session = session = SlowSession(default_records())
+        cq.set_record_cache(None)
+
+        async def fetch():
+            await cq.login('user', 'password', 'repo')
+            return await asyncio.gather(*[
+                cq.get_cq_record_details(resource_id, RecordType.CRP)
+                for resource_id in ['crp-1', 'crp-2'] * 4])
+
+        try:
+            records = asyncio.new_event_loop().run_until_complete(fetch())
+        finally:
+            cq.close_session()
+        self.assertIs(records[0], records[2])
+        self.assertIs(records[0].module, records[1].module)
+        self.assertEqual(4, session.count('GetCQRecordDetails'))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+'''
+Test cases for module libwebcq.store.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from libwebcq.CQ import CQ
+from libwebcq.cache import LRUCache
+from libwebcq.record import RecordType
+from libwebcq.store import FingerprintStore, RecordStore
+from .fakecq import FakeSession, default_records, make_crp_details
+
+
+class RecordStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'records.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def make_cq(self, store):
+        cq = CQ('http://host/cqweb/')
+        cq.session = FakeSession(default_records())
+        cq.set_record_cache(None)
+        cq.set_record_store(store)
+        cq.login('user', 'password', 'repo')
+        return cq
+
+    def test_get_put(self):
+        store = RecordStore(self.path)
+        jobj = make_crp_details('crp-1', 'CRP00001')
+        self.assertIsNone(store.get('crp-1', RecordType.CRP))
+        store.put('crp-1', RecordType.CRP, jobj)
+        self.assertEqual(jobj, store.get('crp-1', RecordType.CRP))
+        self.assertIsNone(store.get('crp-1', RecordType.MODULE))
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+        store.close()
+
+    def test_max_age(self):
+        store = RecordStore(self.path, max_age=-1, final_states=['Closed'])
+        jobj = make_crp_details('crp-1', 'CRP00001')
+        store.put('crp-1', RecordType.CRP, jobj)
+        self.assertIsNone(store.get('crp-1', RecordType.CRP))
+        jobj['fields'][1]['CurrentValue'] = 'Closed'
+        store.put('crp-1', RecordType.CRP, jobj)
+        self.assertEqual(jobj, store.get('crp-1', RecordType.CRP))
+        self.assertEqual({'hits': 1, 'misses': 0, 'stales': 1},
+                         store.stats())
+        store.close()
+
+    def test_warm_start(self):
+        cq = self.make_cq(RecordStore(self.path))
+        cq.get_cq_record_details('crp-1', RecordType.CRP)
+        self.assertEqual(3, cq.session.count('GetCQRecordDetails'))
+        cq.record_store.close()
+
+        cq = self.make_cq(RecordStore(self.path))
+        record = cq.get_cq_record_details('crp-1', RecordType.CRP)
+        self.assertEqual('CRP00001', record.display_name)
+        self.assertEqual('Module One', record.module.display_name)
+        self.assertEqual(0, cq.session.count('GetCQRecordDetails'))
+        cq.invalidate_record('crp-1')
+        cq.get_cq_record_details('crp-1', RecordType.CRP)
+        self.assertEqual(1, cq.session.count('GetCQRecordDetails'))
+        cq.record_store.close()
+
+
+class FingerprintStoreTestCase(unittest.TestCase):
+
+    def test_changed_only(self):
+        session = FakeSession(default_records())
+        cq = CQ('http://host/cqweb/')
+        cq.session = session
+        cq.set_record_cache(None)
+        cq.login('user', 'password', 'repo')
+        fingerprints = FingerprintStore()
+        resource_ids = ['crp-1', 'crp-2', 'crp-3']
+
+        results = list(cq.get_records_details(
+            resource_ids, RecordType.CRP, fingerprints=fingerprints))
+        self.assertEqual(resource_ids, [r.key for r in results])
+
+        jobj = make_crp_details('crp-2', 'CRP00002')
+        jobj['fields'][1]['CurrentValue'] = 'Resolved'
+        session.add(jobj)
+        results = list(cq.get_records_details(
+            resource_ids, RecordType.CRP, fingerprints=fingerprints))
+        # The changed record and the record not found.
+        self.assertEqual(['crp-2', 'crp-3'], [r.key for r in results])
+        self.assertEqual({'changed': 3, 'unchanged': 1}, fingerprints.stats())
+
+    def test_changed_within_cache_ttl(self):
+        session = FakeSession(default_records())
+        cq = CQ('http://host/cqweb/')
+        cq.session = session
+        cq.set_record_cache(LRUCache(ttl=300, record_types=None))
+        cq.login('user', 'password', 'repo')
+        fingerprints = FingerprintStore()
+        list(cq.get_records_details(['crp-1'], RecordType.CRP,
+                                    fingerprints=fingerprints))
+        session.details['crp-1']['fields'][1]['CurrentValue'] = 'Resolved'
+        results = list(cq.get_records_details(['crp-1'], RecordType.CRP,
+                                              fingerprints=fingerprints))
+        self.assertEqual(['crp-1'], [r.key for r in results])
+        self.assertEqual('Resolved', results[0].value.state)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+'''
+Test cases for module libwebcq.stream.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import json
+import time
+import tracemalloc
+import unittest
+
+from libwebcq.CQ import CQ
+from libwebcq.record import CRPRecord, RecordType
+from libwebcq.stream import parse_details
+from .fakecq import FakeSession, default_records, make_crp_details
+
+
+def chunked(text, size):
+    content = text.encode('utf-8')
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+
+class ParseDetailsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.jobj = make_crp_details('crp-1', 'CRP00001')
+        self.jobj['history'] = {'rows': [['a "quoted" \\ ]', 1.5e3, None]]}
+        self.jobj['count'] = 12345
+        self.text = 'for(;;);' + json.dumps(self.jobj, ensure_ascii=False)
+
+    def test_projection(self):
+        for size in (1, 3, 7, 64, 1 << 20):
+            jobj = parse_details(chunked(self.text, size), 'utf-8',
+                                 CRPRecord.detail_keys + ('count',),
+                                 CRPRecord.field_parser_map)
+            self.assertNotIn('history', jobj)
+            self.assertEqual(12345, jobj['count'])
+            self.assertEqual('CRP00001', jobj['DisplayName'])
+            names = [f['FieldName'] for f in jobj['fields']]
+            self.assertEqual(11, len(names))
+            self.assertNotIn('Unused', names)
+
+    def test_all_fields(self):
+        jobj = parse_details(chunked(self.text, 5), 'utf-8',
+                             ('fields', 'history'), None)
+        self.assertEqual(self.jobj['fields'], jobj['fields'])
+        self.assertEqual(self.jobj['history'], jobj['history'])
+
+    def test_unicode(self):
+        text = json.dumps({'DisplayName': '中文', 'fields': []},
+                          ensure_ascii=False)
+        jobj = parse_details(chunked(text, 1), 'utf-8', ('DisplayName',), ())
+        self.assertEqual('中文', jobj['DisplayName'])
+
+    def test_non_strict_json(self):
+        with self.assertRaises(ValueError):
+            parse_details(chunked("for(;;);{STATUS: 'true'}", 4), 'utf-8',
+                          ('STATUS',), ())
+
+    def test_truncated_json(self):
+        with self.assertRaises(ValueError):
+            parse_details(chunked(self.text[:-10], 16), 'utf-8',
+                          CRPRecord.detail_keys, ())
+
+    def test_large_skipped_values(self):
+        # 4 MB history string and 4 MB value of an unwanted field, streamed
+        # in 64 KB chunks, each chunk ends with an escaped backslash.
+        chunk = b'x' * 65534 + b'\\\\'
+        count = 64
+
+        def chunks():
+            yield b'{"history": "'
+            for _ in range(count):
+                yield chunk
+            yield (b'", "fields": [{"FieldName": "Unused", '
+                   b'"CurrentValue": "')
+            for _ in range(count):
+                yield chunk
+            yield (b'"}, {"FieldName": "Headline", "CurrentValue": "a\\\\"}'
+                   b'], "DisplayName": "CRP00001"}')
+
+        tracemalloc.start()
+        start = time.monotonic()
+        try:
+            jobj = parse_details(chunks(), 'utf-8', ('DisplayName',),
+                                 ('Headline',))
+            elapsed = time.monotonic() - start
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual('CRP00001', jobj['DisplayName'])
+        self.assertEqual([{'FieldName': 'Headline', 'CurrentValue': 'a\\'}],
+                         jobj['fields'])
+        self.assertLess(elapsed, 2)
+        self.assertLess(peak, 1 << 20)
+
+
+class CQStreamingTestCase(unittest.TestCase):
+
+    def test_get_record_details(self):
+        cq = CQ('http://host/cqweb/')
+        cq.session = FakeSession(default_records())
+        cq.login('user', 'password', 'repo')
+        cq.set_streaming(True)
+        cq.stream_chunk_size = 16
+        record = cq.get_cq_record_details('crp-1', RecordType.CRP)
+        self.assertEqual('CRP00001', record.display_name)
+        self.assertEqual('123', record.owner_info.tel)
+        self.assertEqual('Module One', record.module.display_name)
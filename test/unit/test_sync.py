@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+'''
+Test cases for module libwebcq.sync.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from libwebcq.CQ import CQ
+from libwebcq.sync import ChangeType, SyncEngine
+from .fakecq import FakeSession, default_records
+
+
+class SyncEngineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'sync.db')
+        self.cq = CQ('http://host/cqweb/')
+        self.cq.session = self.session = FakeSession(default_records())
+        self.cq.login('user', 'password', 'repo')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def events(self, engine, record_ids):
+        return [(e.change_type, e.record_id)
+                for e in engine.sync(record_ids)]
+
+    def test_sync(self):
+        engine = SyncEngine(self.cq, self.path, batch_size=1)
+        self.assertIsNone(engine.last_sync_time)
+        self.assertEqual(
+            [(ChangeType.ADDED, 'CRP00001'), (ChangeType.ADDED, 'CRP00002'),
+             (ChangeType.FAILED, 'CRP00003')],
+            self.events(engine, ['CRP00001', 'CRP00002', 'CRP00003']))
+        self.assertIsNotNone(engine.last_sync_time)
+
+        self.session.details['crp-2']['fields'][2]['CurrentValue'] = \
+            '2018-01-01T00:00:00Z'
+        self.assertEqual(
+            [(ChangeType.UNCHANGED, 'CRP00001'),
+             (ChangeType.CHANGED, 'CRP00002')],
+            self.events(engine, ['CRP00001', 'CRP00002']))
+        # Resource ids are known, no more DoFindRecord.
+        self.assertEqual(3, self.session.count('DoFindRecord'))
+        engine.close()
+
+    def test_resume(self):
+        engine = SyncEngine(self.cq, self.path, batch_size=1)
+        events = engine.sync(['CRP00001', 'CRP00002'])
+        self.assertEqual('CRP00001', next(events).record_id)
+        # Consume the next event to commit the first batch, then crash.
+        self.assertEqual('CRP00002', next(events).record_id)
+        events.close()
+        engine.close()
+
+        engine = SyncEngine(self.cq, self.path, batch_size=1)
+        self.assertEqual([(ChangeType.ADDED, 'CRP00002')],
+                         self.events(engine, ['CRP00001', 'CRP00002']))
+        self.assertIsNotNone(engine.last_sync_time)
+        engine.close()
+
+    def test_final_states(self):
+        engine = SyncEngine(self.cq, self.path, final_states=['Assigned'])
+        self.events(engine, ['CRP00001'])
+        count = self.session.count('GetCQRecordDetails')
+        self.assertEqual([(ChangeType.UNCHANGED, 'CRP00001')],
+                         self.events(engine, ['CRP00001']))
+        self.assertEqual(count, self.session.count('GetCQRecordDetails'))
+        engine.close()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+'''
+Test cases for module libwebcq.throttle and throttled requests of
+libwebcq.CQ.
+'''
+
+# Author: weichen2046@gmail.com
+# Create Date: 2026.10.18
+
+import threading
+import time
+import unittest
+
+from libwebcq.CQ import CQ
+from libwebcq.instrument import MetricsCollector
+from libwebcq.throttle import AdaptiveLimiter, TokenBucket
+from .fakecq import FakeResponse, FakeSession, default_records
+
+
+class TokenBucketTestCase(unittest.TestCase):
+
+    def test_rate(self):
+        bucket = TokenBucket(rate=100, burst=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+
+class AdaptiveLimiterTestCase(unittest.TestCase):
+
+    def test_increase(self):
+        limiter = AdaptiveLimiter(initial_limit=2, max_limit=4)
+        for _ in range(20):
+            limiter.release(limiter.acquire(), 0.01)
+        self.assertEqual(4, limiter.stats()['limit'])
+
+    def test_decrease_on_error(self):
+        limiter = AdaptiveLimiter(initial_limit=8)
+        tokens = [limiter.acquire() for _ in range(4)]
+        for token in tokens:
+            limiter.release(token, 0.01, error=True)
+        # Requests in flight at the decrease do not decrease again.
+        self.assertEqual(4, limiter.stats()['limit'])
+        self.assertEqual(1, limiter.decreases)
+
+    def test_decrease_on_latency_spike(self):
+        limiter = AdaptiveLimiter(initial_limit=8)
+        for _ in range(5):
+            limiter.release(limiter.acquire(), 0.01)
+        limiter.release(limiter.acquire(), 0.5)
+        self.assertEqual(4, limiter.stats()['limit'])
+
+    def test_mixed_action_latencies(self):
+        limiter = AdaptiveLimiter(initial_limit=2, max_limit=8)
+        for _ in range(40):
+            limiter.release(limiter.acquire(), 0.01, action='FIND_RECORD')
+            limiter.release(limiter.acquire(), 0.06,
+                            action='GET_CQ_RECORD_DETAILS')
+        self.assertEqual(8, limiter.stats()['limit'])
+        self.assertEqual(0, limiter.decreases)
+        latency = limiter.stats()['latency']
+        self.assertAlmostEqual(0.01, latency['FIND_RECORD'])
+        self.assertAlmostEqual(0.06, latency['GET_CQ_RECORD_DETAILS'])
+
+    def test_lasting_slowdown_becomes_baseline(self):
+        limiter = AdaptiveLimiter(initial_limit=8)
+        limiter.release(limiter.acquire(), 0.01)
+        for _ in range(40):
+            limiter.release(limiter.acquire(), 0.05)
+        decreases = limiter.decreases
+        limiter.release(limiter.acquire(), 0.05)
+        self.assertEqual(decreases, limiter.decreases)
+
+    def test_queue(self):
+        limiter = AdaptiveLimiter(initial_limit=1)
+        token = limiter.acquire()
+        thread = threading.Thread(target=limiter.acquire)
+        thread.start()
+        while limiter.stats()['queue_depth'] == 0:
+            time.sleep(0.001)
+        self.assertEqual(1, limiter.stats()['in_flight'])
+        limiter.release(token, 0.01)
+        thread.join()
+        self.assertEqual(0, limiter.stats()['queue_depth'])
+        self.assertEqual(1, limiter.throttled)
+
+
+class OverloadedSession(FakeSession):
+    '''
+    Answer 503 when more than `capacity` requests are in flight.
+    '''
+
+    def __init__(self, capacity):
+        super(OverloadedSession, self).__init__(default_records())
+        self.capacity = capacity
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def request(self, method, url, params=None, data=None, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            overloaded = self.in_flight > self.capacity
+        try:
+            time.sleep(0.002)
+            if overloaded and params['action'] == 'DoFindRecord':
+                return FakeResponse({}, status_code=503)
+            return super(OverloadedSession, self).request(
+                method, url, params, data, **kwargs)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class ThrottledCQTestCase(unittest.TestCase):
+
+    def test_limit(self):
+        cq = CQ('http://host/cqweb/')
+        cq.session = OverloadedSession(capacity=100)
+        cq.set_single_flight(False)
+        cq.set_throttle(AdaptiveLimiter(initial_limit=2, max_limit=3))
+        self.assertEqual(8, cq.max_workers)
+        cq.login('user', 'password', 'repo')
+        results = list(cq.find_records(['CRP00001'] * 30))
+        self.assertTrue(all(result.value == 'crp-1' for result in results))
+        self.assertLessEqual(cq.session.max_in_flight, 3)
+
+        collector = MetricsCollector()
+        collector.install(cq)
+        self.assertEqual(3, collector.snapshot()['throttle'][0]['limit'])
+
+    def test_back_off(self):
+        cq = CQ('http://host/cqweb/')
+        cq.session = OverloadedSession(capacity=2)
+        cq.set_single_flight(False)
+        cq.set_throttle(AdaptiveLimiter(initial_limit=8, max_limit=8))
+        cq.set_retry_policy(None)
+        cq.login('user', 'password', 'repo')
+        list(cq.find_records(['CRP00001'] * 40))
+        self.assertGreater(cq.throttle.decreases, 0)
+        self.assertLess(cq.throttle.stats()['limit'], 8)